@@ -16,6 +16,11 @@ if [[ "$ARCH" != "aarch64" ]]; then
     exec python3 "$SRC" "$@"
 fi
 
+# The budget check's exit status is its verdict, not a crash
+if [[ " $* " == *" --startup-budget "* ]]; then
+    exec "$BIN" "$@"
+fi
+
 # Try binary, fallback if it fails
 "$BIN" "$@" || {
     echo "Native binary failed, running interpreted."
@@ -2,19 +2,26 @@
 
 try:
     import os
-    from sys import exit, stdin, stdout, argv
+    from sys import exit, stdin, stdout, stderr, argv, implementation
     from time import monotonic, time
 
+    started = monotonic()
+
     screensaver_mode = "-s" in argv[1:]
+    # Render one frame and exit non-zero if it missed STARTUP_BUDGET
+    budget_mode = "--startup-budget" in argv[1:]
+    if budget_mode and not stdin.isatty():
+        stderr.write("--startup-budget needs a terminal\n")
+        exit(2)
     hush_login_path = os.path.expanduser("~/.hush_login")
-    if (
-        os.path.isfile(hush_login_path) or (not stdin.isatty())
-    ) and not screensaver_mode:
+    if (os.path.isfile(hush_login_path) or (not stdin.isatty())) and not (
+        screensaver_mode or budget_mode
+    ):
         exit(0)
 
     # Exit if for some fuckshit reason one of these called us.
     pid = os.getpid()
-    while pid > 1:
+    while pid > 1 and not budget_mode:
         try:
             with open(f"/proc/{pid}/comm") as f:
                 name = f.read().strip()
@@ -27,18 +34,24 @@ try:
         except Exception:
             break
 
-    if "HUSH_NEWS" in os.environ and os.environ["HUSH_NEWS"] == "1":
+    if "HUSH_NEWS" in os.environ and os.environ["HUSH_NEWS"] == "1" and not budget_mode:
         exit(0)
 
     path = f"/tmp/news_run_{os.getuid()}.txt"
     try:
         with open(path, "r") as f:
             ts = int(f.read().strip())
-        if time() - ts <= 2:
+        if time() - ts <= 2 and not budget_mode:
             exit(0)
     except (FileNotFoundError, ValueError):
         pass
 
+    # Typed ahead, don't get in the way of it
+    import select
+
+    if select.select([stdin], [], [], 0)[0] != [] and not budget_mode:
+        exit(0)
+
     hush_news_path = os.path.expanduser("~/.hush_news")
     hush_updates_path = os.path.expanduser("~/.hush_updates")
     hush_disks_path = os.path.expanduser("~/.hush_disks")
@@ -48,26 +61,20 @@ try:
     hush_disks = (not os.geteuid()) or os.path.isfile(hush_disks_path)
     hush_smart = (not os.geteuid()) or os.path.isfile(hush_smart_path)
 
-    import asyncio, platform, psutil, socket, json, re
-    import signal, shutil, termios, tty, select, fcntl
-    import subprocess, shlex, types
+    # psutil, platform, jeepney, pyinotify and subprocess are imported where used
+    import asyncio, socket, json, re, marshal
+    import signal, shutil, termios, tty, fcntl
+    import types, struct, threading, mmap
     from collections import Counter
-    from pathlib import Path
-    from datetime import datetime, timedelta
+    from datetime import datetime
+
+    imported = monotonic()
 except KeyboardInterrupt:
     import os
 
     os._exit(0)
 
 
-def exit_on_buffer():
-    if select.select([stdin], [], [], 0)[0] != []:
-        os._exit(0)
-
-
-exit_on_buffer()
-
-
 def terminal_size() -> tuple:
     try:
         size = shutil.get_terminal_size(fallback=(999, 999))
@@ -80,6 +87,36 @@ def terminal_size() -> tuple:
 
 
 CACHE_FILE = "/tmp/news_cache.json"
+SNAPSHOT_FILE = "/tmp/news_cache.bin"
+
+# Snapshot header: magic, format version, generation, payload length.
+# Keep in sync with the server.
+SNAPSHOT_MAGIC = b"BNEWS\0"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<6sHQI")
+SNAPSHOT_GENERATION = slice(8, 16)
+UTMP_FILE = "/run/utmp"
+MOUNTINFO_FILE = "/proc/self/mountinfo"
+STATVFS_TIMEOUT = 0.5
+
+# glibc `struct utmp`, identical on x86_64 and aarch64
+UTMP_RECORD = struct.Struct("=hxxi32s4s32s256shhi8x16x20x")
+UTMP_USER_PROCESS = 7
+
+# Frames are skipped while earlier output is still queued for the terminal,
+# and the animation slows down to what the measured drain rate allows, up to
+# FRAME_MAX_TICK seconds between frames.
+FRAME_MAX_TICK = 2
+
+NEWSRC_CACHE = os.path.expanduser("~/.cache/bredos-news/newsrc.bin")
+
+# Seconds from startup to the first frame. Set BREDOS_NEWS_TIMING=1 to get
+# the startup phases reported on exit. With --startup-budget the first
+# frame is all that is drawn, and missing the budget is exit status 1.
+STARTUP_BUDGET = 0.5
+
+SYSTEMD_BUS_NAME = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
 
 DEFAULT_CONF = """\"\"\"
 BredOS-News Configuration
@@ -98,6 +135,9 @@ for detailed instructions on how to configure.
 # Time_Refresh = 0.25
 # Onetime = False
 
+# Seconds between refreshes of each data source.
+# Refresh_Intervals = {"load": 0.25, "disks": 30, "updates": 1}
+
 \"\"\"
 Shortcuts configuration
 
@@ -123,6 +163,7 @@ shortcuts["?"] = shortcuts_help
 
 printed_lines = 0
 last_lines = []
+last_widths = {}
 last_size = terminal_size()
 ansi_re = re.compile(
     r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~]|\][^\x07]*(?:\x07|\x1B\\)|P[^\x1B]*\x1B\\|_[^\x1B]*\x1B\\|\^[^\x1B]*\x1B\\|X.)",
@@ -136,6 +177,30 @@ _last_run_data = {}
 _run = []
 _shell = os.environ["SHELL"]
 
+# Seconds between refreshes of each data source.
+# Overridable per source through `Refresh_Intervals` in `~/.newsrc`.
+refresh_intervals = {
+    "load": 0.25,
+    "memory": 1,
+    "users": 1,
+    "services": 1,
+    "uptime": 10,
+    "net": 10,
+    "disks": 30,
+    "updates": 1,
+}
+_collectors = {}
+_collected = {}
+_collected_at = {}
+_collecting = {}
+_unit_states = {}
+_mounts_poll = []
+_stale_mounts = set()
+_snapshot = {}
+_sections = {}
+_startup = {"imports": imported - started}
+_frames = {"tick": 0, "queued": 0, "at": 0.0}
+
 
 def once(func):
     tag = func.__name__
@@ -153,77 +218,215 @@ def once(func):
     return wrapper
 
 
-def phy_lines(lines: list[str]) -> list:
-    res = []
-    buf = ""
-    for chunk in lines:
-        buf += chunk
-        while True:
-            nl_pos = buf.find("\n")
-            if nl_pos == -1:
-                break
-            # Append substring up to newline (excluding '\n')
-            res.append(buf[:nl_pos])
-            buf = buf[nl_pos + 1 :]
+def startup_mark(phase: str) -> None:
+    _startup.setdefault(phase, monotonic() - started)
+
+
+def startup_within_budget() -> bool:
+    return _startup.get("first frame", STARTUP_BUDGET + 1) <= STARTUP_BUDGET
+
+
+def startup_report() -> None:
+    if "first frame" not in _startup or not (
+        budget_mode or os.environ.get("BREDOS_NEWS_TIMING") == "1"
+    ):
+        return
+    phases = ", ".join(f"{phase} {at * 1000:.1f}ms" for phase, at in _startup.items())
+    verdict = "within" if startup_within_budget() else "OVER"
+    stderr.write(
+        f"Startup: {phases} ({verdict} the {STARTUP_BUDGET * 1000:.0f}ms budget)\n"
+    )
+
+
+def in_thread(func, *args) -> asyncio.Future:
+    # Daemon threads, so a call stuck in the kernel never holds up exiting.
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(setter, value) -> None:
+        if not future.done():
+            setter(value)
 
-    # Append remainder if any (no trailing newline)
-    if buf:
-        res.append(buf)
+    def worker() -> None:
+        try:
+            result = (future.set_result, func(*args))
+        except BaseException as err:
+            result = (future.set_exception, err)
+        try:
+            loop.call_soon_threadsafe(settle, *result)
+        except RuntimeError:
+            pass  # Loop already gone
+
+    threading.Thread(target=worker, daemon=True).start()
+    return future
+
+
+def collector(tag, timeout=1, fallback=None):
+    def decorator(func):
+        _collectors[tag] = (func, timeout, fallback)
+        return func
+
+    return decorator
+
+
+def collected_late(tag, run) -> None:
+    _collecting.pop(tag, None)
+    if not run.cancelled() and run.exception() is None:
+        _collected[tag] = run.result()
+
+
+async def collect(tag, now) -> None:
+    func, timeout, fallback = _collectors[tag]
+    if tag in _collecting:
+        return  # Previous run blew its deadline and is still going
+
+    if asyncio.iscoroutinefunction(func):
+        run = asyncio.ensure_future(func())
+    else:
+        run = in_thread(func)
+    _collecting[tag] = run
+    _collected_at[tag] = now
+    run.add_done_callback(lambda run: collected_late(tag, run))
+
+    try:
+        _collected[tag] = await asyncio.wait_for(asyncio.shield(run), timeout)
+    except Exception:
+        # Keep showing the last known value, a late result still lands
+        if tag not in _collected:
+            _collected[tag] = fallback
+
+
+async def run_collectors() -> None:
+    # Only rerun the sources that are due, the rest keep their last value.
+    # Everything due runs at once, so a frame waits at most for the slowest
+    # deadline instead of the sum of all sources.
+    now = monotonic()
+    due = []
+    for tag in _collectors:
+        last = _collected_at.get(tag)
+        if last is not None and now - last < refresh_intervals.get(tag, 0):
+            continue
+        due.append(collect(tag, now))
+    await asyncio.gather(*due)
+
+
+def phy_lines(lines: list[str]) -> list:
+    # One join and split, instead of growing a buffer chunk by chunk
+    res = "".join(lines).split("\n")
+    if res[-1] == "":
+        res.pop()
     return res
 
 
+def line_width(line: str) -> int:
+    width = last_widths.get(line)
+    if width is None:
+        width = len(ansi_re.sub("", line)) if "\033" in line else len(line)
+    return width
+
+
+def move_rows(out: list, row: int, target: int) -> None:
+    if target < row:
+        out.append(f"\033[{row - target}F")
+    elif target > row:
+        out.append(f"\033[{target - row}E")
+
+
+def draw(lines: list[str], prefix: str = "") -> None:
+    # Rewrites only the lines that differ from the last frame, all in one
+    # write. Between frames the cursor rests on the line below the block.
+    global printed_lines, last_lines
+    out = [prefix] if prefix else []
+    row = printed_lines
+    for i, line in enumerate(lines):
+        if i < len(last_lines) and last_lines[i] == line:
+            continue
+        move_rows(out, row, i)
+        out.append(f"\033[2K{line}\n")
+        row = i + 1
+
+    # Clear leftovers if we previously printed more lines
+    if len(lines) < printed_lines:
+        move_rows(out, row, len(lines))
+        out.append("\033[J")
+        row = len(lines)
+    move_rows(out, row, len(lines))
+
+    printed_lines = len(lines)
+    last_lines = lines
+    if out:
+        stamp = monotonic()
+        stdout.write("".join(out))
+        stdout.flush()
+        now = monotonic()
+        _frames.update(queued=output_backlog(), at=now)
+        if now - stamp > Time_Tick:
+            # The write itself had to wait for room
+            _frames["tick"] = min(
+                max(_frames["tick"], 2 * (now - stamp)), FRAME_MAX_TICK
+            )
+
+
+def output_backlog() -> int:
+    # Bytes written but not yet taken off the terminal. Serial ttys count
+    # them, a pty only shows it by no longer being writable.
+    try:
+        queued = fcntl.ioctl(stdout.fileno(), termios.TIOCOUTQ, b"\0\0\0\0")
+        queued = struct.unpack("i", queued)[0]
+    except (OSError, ValueError):
+        queued = 0
+    if queued <= 0 and not select.select([], [stdout], [], 0)[1]:
+        return 1  # Backed up, by how much is unknown
+    return queued
+
+
+def frame_allowed() -> bool:
+    now = monotonic()
+    backlog = output_backlog()
+    drained = _frames["queued"] - backlog
+    elapsed = now - _frames["at"]
+    _frames.update(queued=backlog, at=now)
+    if backlog <= 0:
+        # Caught up, ease back to the configured rate
+        _frames["tick"] = max(_frames["tick"] / 2, Time_Tick)
+        return True
+    if drained > 0 and elapsed > 0:
+        tick = backlog * elapsed / drained
+    else:
+        tick = FRAME_MAX_TICK  # Nothing moved, pause until it does
+    _frames["tick"] = min(max(tick, Time_Tick), FRAME_MAX_TICK)
+    return False
+
+
 def refresh_lines(new_lines: list[str]) -> None:
-    global printed_lines, last_lines, last_size, tix, awidth
+    global printed_lines, last_lines, last_size, last_widths, tix, awidth
+    prefix = ""
     curterm = terminal_size()
     if curterm != last_size:
-        stdout.write("\033[2J\033[3J\033[H")
+        prefix = "\033[2J\033[3J\033[H"
         last_lines = []
         printed_lines = 0
         tix = 0
         last_size = curterm
 
-    physical_lines = []
-    buf = ""
-
     physical_lines = phy_lines(new_lines)
 
-    if physical_lines == last_lines:
-        return
-
-    new_physical_lines = len(physical_lines)
-
-    # Move up N == printed_lines
-    if printed_lines:
-        stdout.write(f"\033[{printed_lines}F")
+    # Widths of lines already seen last frame are reused
+    widths = {line: line_width(line) for line in physical_lines}
+    last_widths = widths
 
     # Terminal size checks
-    if (curterm[1] < new_physical_lines + 1) or (
-        curterm[0] < max(len(ansi_re.sub("", line)) for line in physical_lines)
+    if (curterm[1] < len(physical_lines) + 1) or (
+        curterm[0] < max(widths.values(), default=0)
     ):
         awidth = terminal_size()[0]
         physical_lines = [
             physical_lines[0],
             animation(),
         ]
-        new_physical_lines = 2
 
-    # Print the new physical lines exactly as-is
-    for i in range(len(physical_lines)):
-        if (new_physical_lines != printed_lines) or (
-            physical_lines[i] != last_lines[i]
-        ):
-            stdout.write(f"\033[2K{physical_lines[i]}\n")
-        else:
-            print()
-
-    # Clear leftovers if we previously printed more lines
-    if printed_lines > new_physical_lines:
-        for _ in range(printed_lines - new_physical_lines):
-            print("\x1b[2K")
-        stdout.write(f"\033[{printed_lines-new_physical_lines}F")
-
-    printed_lines = new_physical_lines
-    last_lines = physical_lines
+    if prefix or frame_allowed():
+        draw(physical_lines, prefix)
 
 
 sbcs = {
@@ -443,6 +646,8 @@ def arm_part_id_to_name(part_id: int) -> str:
 
 @once
 def get_sys_id() -> tuple:
+    import platform, psutil
+
     hostname = platform.node()
     os_info = f"GNU/Linux {platform.release()} {platform.machine()}"
 
@@ -497,6 +702,8 @@ def get_sys_id() -> tuple:
 
 
 def get_active_ipv4_interfaces() -> dict:
+    import psutil
+
     active_interfaces = {}
     for iface, addrs in psutil.net_if_addrs().items():
         for addr in addrs:
@@ -509,67 +716,114 @@ def get_active_ipv4_interfaces() -> dict:
     return active_interfaces
 
 
-def get_storage_usages() -> dict:
-    mounts = {}
-    seen_devices = set()
+def unescape_mount_path(path: str) -> str:
+    # Spaces, tabs, newlines and backslashes are octal escaped by the kernel
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), path)
 
-    with open("/proc/mounts", "r") as f:
+
+def parse_mountinfo(path: str = MOUNTINFO_FILE) -> list:
+    mounts = []
+    with open(path, "r") as f:
         for line in f:
             parts = line.split()
-            if len(parts) < 2:
+            try:
+                sep = parts.index("-", 6)
+                mountpoint = unescape_mount_path(parts[4])
+                fstype, source, options = parts[sep + 1 : sep + 4]
+            except ValueError:
                 continue
-            device, mountpoint = parts[0], parts[1]
 
-            # Skip non-real devices
-            if not device.startswith(("/dev/", "UUID=", "LABEL=")):
-                continue
+            subvol = None
+            if fstype == "btrfs":
+                for opt in options.split(","):
+                    if opt.startswith("subvol="):
+                        subvol = unescape_mount_path(opt[7:]).rstrip("/")
+                        subvol = subvol.rsplit("/", 1)[-1] or "/"
+                        break
+            mounts.append(
+                (int(parts[0]), unescape_mount_path(source), mountpoint, fstype, subvol)
+            )
+    return mounts
+
+
+def mount_table() -> list:
+    # The kernel flags /proc/self/mounts with POLLPRI whenever anything gets
+    # (un)mounted, only rebuild the parsed table when that happened.
+    if not _mounts_poll:
+        f = open("/proc/self/mounts", "r")
+        poller = select.poll()
+        poller.register(f, select.POLLPRI | select.POLLERR)
+        _mounts_poll.extend((f, poller))
+    elif "mounts" in _last_run_data and not _mounts_poll[1].poll(0):
+        return _last_run_data["mounts"]
 
-            # Skip duplicates
+    _last_run_data["mounts"] = parse_mountinfo()
+    return _last_run_data["mounts"]
+
+
+async def probe_mount(mount_id: int, mountpoint: str):
+    # A mount that missed its deadline once is left alone until the probe
+    # finally returns or it gets remounted (which gives it a new id).
+    if mount_id in _stale_mounts:
+        return None
+
+    probe = in_thread(os.statvfs, mountpoint)
+    try:
+        return await asyncio.wait_for(asyncio.shield(probe), STATVFS_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stale_mounts.add(mount_id)
+        probe.add_done_callback(lambda _: _stale_mounts.discard(mount_id))
+        return None
+
+
+async def get_storage_usages() -> dict:
+    mounts = {}
+    seen_devices = set()
+    candidates = []
+
+    for mount_id, device, mountpoint, fstype, subvol in mount_table():
+        # Skip non-real devices
+        if not device.startswith(("/dev/", "UUID=", "LABEL=")):
+            continue
+
+        # Skip duplicates
+        real_device = device
+        if device.startswith("/dev/"):
             real_device = os.path.realpath(device)
-            if real_device in seen_devices:
-                continue
-            seen_devices.add(real_device)
+        if real_device in seen_devices:
+            continue
+        seen_devices.add(real_device)
 
-            try:
-                stats = os.statvfs(mountpoint)
-                total_bytes = stats.f_frsize * stats.f_blocks
-                free_bytes = stats.f_frsize * stats.f_bavail
-                used_bytes = total_bytes - free_bytes
-                if total_bytes == 0:
-                    continue  # Skip empty fs
-                percent_used = round((used_bytes / total_bytes) * 100, 1)
-            except Exception:
-                continue  # Skip unreadable
+        if (
+            "/efi" in mountpoint or "/boot" in mountpoint or len(mountpoint) > 40
+        ):  # Don't do boot partitions or Panda's gayshit
+            continue
 
-            if (
-                "/efi" in mountpoint or "/boot" in mountpoint or len(mountpoint) > 40
-            ):  # Don't do boot partitions or Panda's gayshit
-                continue
+        if subvol not in (None, "@", "/"):
+            continue  # skip subvols like @home
 
-            try:
-                fstype = subprocess.check_output(
-                    ["findmnt", "-no", "FSTYPE", "--target", mountpoint],
-                    timeout=2,
-                    text=True,
-                ).strip()
-
-                if fstype == "btrfs":
-                    subvol = subprocess.check_output(
-                        ["btrfs", "subvolume", "show", mountpoint],
-                        stderr=subprocess.DEVNULL,
-                        text=True,
-                    )
-                    for line in subvol.splitlines():
-                        if line.strip().startswith("Name:"):
-                            name = line.strip().split(":", 1)[1].strip()
-                            if name not in ("@", "/"):
-                                break  # skip subvols like @home
-                    else:
-                        mounts[mountpoint] = [percent_used, total_bytes]
-                else:
-                    mounts[mountpoint] = [percent_used, total_bytes]
-            except:
-                mounts[mountpoint] = [percent_used, total_bytes]  # fallback
+        candidates.append((mount_id, mountpoint))
+
+    probes = await asyncio.gather(
+        *(probe_mount(mount_id, mountpoint) for mount_id, mountpoint in candidates),
+        return_exceptions=True,
+    )
+
+    for (mount_id, mountpoint), stats in zip(candidates, probes):
+        if stats is None:
+            mounts[mountpoint] = [None, 0]  # Stale, did not answer in time
+            continue
+        if isinstance(stats, Exception):
+            continue  # Skip unreadable
+
+        total_bytes = stats.f_frsize * stats.f_blocks
+        free_bytes = stats.f_frsize * stats.f_bavail
+        used_bytes = total_bytes - free_bytes
+        if total_bytes == 0:
+            continue  # Skip empty fs
+        percent_used = round((used_bytes / total_bytes) * 100, 1)
+
+        mounts[mountpoint] = [percent_used, total_bytes]
 
     if "/" in mounts:
         mounts["Usage of /"] = mounts["/"]
@@ -577,17 +831,9 @@ def get_storage_usages() -> dict:
     return mounts
 
 
-async def get_system_info() -> dict:
-    (
-        hostname,
-        os_info,
-        cpu_model,
-        vendor,
-        part_name,
-        cpu_count,
-        cpu_threads,
-        total_memory,
-    ) = get_sys_id()
+@collector("uptime", fallback="unavailable")
+def get_uptime() -> str:
+    import psutil
 
     uptime_seconds = int(psutil.boot_time())
     uptime = datetime.now() - datetime.fromtimestamp(uptime_seconds)
@@ -609,14 +855,60 @@ async def get_system_info() -> dict:
         uptime_str += f"{minutes} minutes"
     else:
         uptime_str += "seconds"
+    return uptime_str
+
 
+@collector("load", fallback=("unavailable", 0))
+def get_load() -> tuple:
     with open("/proc/loadavg") as f:
         load_avg = f.read().split()[0]
 
     with open("/proc/stat") as f:
         processes = sum(1 for line in f if line.startswith("processes"))
 
-    disks = get_storage_usages()
+    return load_avg, processes
+
+
+@collector("disks", fallback={})
+async def get_disks() -> dict:
+    if hush_disks:
+        return {}
+    return await get_storage_usages()
+
+
+def read_utmp_users(path: str = UTMP_FILE) -> set:
+    with open(path, "rb") as f:
+        data = f.read()
+    data = data[: len(data) - (len(data) % UTMP_RECORD.size)]
+
+    users = set()
+    for ut_type, ut_pid, _, _, ut_user, *_ in UTMP_RECORD.iter_unpack(data):
+        if ut_type != UTMP_USER_PROCESS:
+            continue
+        # Same as `who`, skip stale entries of sessions that died uncleanly
+        if ut_pid > 0:
+            try:
+                os.kill(ut_pid, 0)
+            except ProcessLookupError:
+                continue
+            except PermissionError:
+                pass
+        users.add(ut_user.split(b"\0", 1)[0].decode(errors="replace"))
+    return users
+
+
+@collector("users", fallback="unavailable")
+async def get_logged_in_users() -> int:
+    try:
+        mtime = os.stat(UTMP_FILE).st_mtime_ns
+        entry = _last_run_data.get("utmp")
+        if entry and entry[0] == mtime:
+            return entry[1]
+        logged_in_users = len(read_utmp_users())
+        _last_run_data["utmp"] = (mtime, logged_in_users)
+        return logged_in_users
+    except OSError:
+        pass  # No utmp on this system, ask `who` instead
 
     logged_in_users = 0
     try:
@@ -636,7 +928,11 @@ async def get_system_info() -> dict:
         logged_in_users = len(seen_users)
     except:
         pass
+    return logged_in_users
+
 
+@collector("memory", fallback=("unavailable", None))
+def get_memory_usage() -> tuple:
     with open("/proc/meminfo") as f:
         meminfo = {line.split(":")[0]: int(line.split()[1]) for line in f}
     mem_usage_percent = (
@@ -648,26 +944,46 @@ async def get_system_info() -> dict:
         if meminfo["SwapTotal"] > 0
         else None
     )
+    return f"{mem_usage_percent:.1f}%", (
+        f"{swap_usage_percent:.1f}%" if swap_usage_percent is not None else None
+    )
+
 
-    net_ifs = get_active_ipv4_interfaces()
+@collector("net", fallback={})
+def get_net_ifs() -> dict:
+    return get_active_ipv4_interfaces()
+
+
+def get_system_info() -> dict:
+    (
+        hostname,
+        os_info,
+        cpu_model,
+        vendor,
+        part_name,
+        cpu_count,
+        cpu_threads,
+        total_memory,
+    ) = get_sys_id()
+
+    load_avg, processes = _collected["load"]
+    memory_usage, swap_usage = _collected["memory"]
 
     return {
         "system_load": load_avg,
         "processes": processes,
         "hostname": hostname,
-        "uptime": uptime_str,
+        "uptime": _collected["uptime"],
         "cpu_model": cpu_model,
         "cpu_count": cpu_count,
         "cpu_threads": cpu_threads,
         "os_info": os_info,
         "total_memory": total_memory,
-        "disks": disks,
-        "logged_in_users": logged_in_users,
-        "memory_usage": f"{mem_usage_percent:.1f}%",
-        "net_ifs": net_ifs,
-        "swap_usage": (
-            f"{swap_usage_percent:.1f}%" if swap_usage_percent is not None else None
-        ),
+        "disks": _collected["disks"],
+        "logged_in_users": _collected["users"],
+        "memory_usage": memory_usage,
+        "net_ifs": _collected["net"],
+        "swap_usage": swap_usage,
     }
 
 
@@ -684,19 +1000,158 @@ async def get_service_statuses(command: str) -> Counter:
     return Counter(statuses)
 
 
+class UnitStates:
+    # Service unit states of one systemd instance, taken once with ListUnits
+    # and then kept current from the signals systemd sends on `bus`.
+
+    def __init__(self, bus: str = "SYSTEM") -> None:
+        self.bus = bus
+        self.states = {}
+        self.paths = {}
+        self.alive = True
+        self.ready = asyncio.Event()
+        self.task = None
+
+    def start(self) -> None:
+        self.task = asyncio.ensure_future(self.run())
+
+    def usable(self) -> bool:
+        return self.alive and self.ready.is_set()
+
+    async def run(self) -> None:
+        try:
+            async with open_dbus_router(self.bus) as router:
+                await self.watch(router)
+        except Exception:
+            pass
+        self.alive = False
+        self.ready.set()
+
+    async def watch(self, router) -> None:
+        manager = DBusAddress(
+            SYSTEMD_PATH,
+            bus_name=SYSTEMD_BUS_NAME,
+            interface=SYSTEMD_BUS_NAME + ".Manager",
+        )
+        rules = [
+            MatchRule(
+                type="signal",
+                interface="org.freedesktop.DBus.Properties",
+                member="PropertiesChanged",
+                path_namespace=SYSTEMD_PATH + "/unit",
+            ),
+            MatchRule(type="signal", interface=manager.interface, member="UnitNew"),
+            MatchRule(type="signal", interface=manager.interface, member="UnitRemoved"),
+        ]
+        signals = asyncio.Queue()
+        filters = [router.filter(rule, queue=signals) for rule in rules]
+        try:
+            for rule in rules:
+                await router.send_and_get_reply(message_bus.AddMatch(rule))
+            # Without a subscriber systemd does not emit unit signals at all
+            await router.send_and_get_reply(new_method_call(manager, "Subscribe"))
+            reply = await router.send_and_get_reply(
+                new_method_call(manager, "ListUnits")
+            )
+            for name, _, _, _, sub, _, path, *_ in reply.body[0]:
+                if name.endswith(".service"):
+                    self.paths[path] = name
+                    self.states[name] = sub
+            self.ready.set()
+
+            while True:
+                self.handle(await signals.get())
+        finally:
+            for f in filters:
+                f.close()
+
+    def handle(self, msg) -> None:
+        member = msg.header.fields[HeaderFields.member]
+        if member == "UnitNew":
+            name, path = msg.body
+            if name.endswith(".service"):
+                self.paths[path] = name
+        elif member == "UnitRemoved":
+            name = self.paths.pop(msg.body[1], None)
+            self.states.pop(name, None)
+        else:
+            name = self.paths.get(msg.header.fields[HeaderFields.path])
+            changed = msg.body[1]
+            if name is not None and "SubState" in changed:
+                self.states[name] = changed["SubState"][1]
+
+    def statuses(self) -> Counter:
+        return Counter(
+            state
+            for state in self.states.values()
+            if state not in ["running", "exited", "dead"]
+        )
+
+    def failed(self) -> list:
+        return sorted(name for name, state in self.states.items() if state == "failed")
+
+
+def systemd_buses() -> dict:
+    buses = {"system": "SYSTEM"}
+    user_bus = f"/run/user/{os.getuid()}/bus"
+    if "DBUS_SESSION_BUS_ADDRESS" in os.environ:
+        buses["user"] = "SESSION"
+    elif os.path.exists(user_bus):
+        buses["user"] = f"unix:path={user_bus}"
+    return buses
+
+
+def load_jeepney() -> bool:
+    # Only the services collector talks D-Bus, import it on first use
+    global DBusAddress, HeaderFields, MatchRule, new_method_call
+    global message_bus, open_dbus_router
+    if "jeepney" not in _last_run_data:
+        try:
+            from jeepney import DBusAddress, HeaderFields, MatchRule, new_method_call
+            from jeepney.bus_messages import message_bus
+            from jeepney.io.asyncio import open_dbus_router
+
+            _last_run_data["jeepney"] = True
+        except ImportError:
+            _last_run_data["jeepney"] = False
+    return _last_run_data["jeepney"]
+
+
+async def start_unit_states(buses: dict) -> None:
+    for scope, bus in buses.items():
+        _unit_states[scope] = UnitStates(bus)
+        _unit_states[scope].start()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(u.ready.wait() for u in _unit_states.values())), 1
+        )
+    except asyncio.TimeoutError:
+        pass  # Fall back to systemctl until the snapshot arrives
+
+
+@collector("services", timeout=2)
 async def count_failed_systemd() -> dict:
-    system_statuses = await get_service_statuses(
-        "systemctl list-units --type=service --no-legend --no-pager | awk '{print $4}'"
-    )
+    if not _unit_states and load_jeepney():
+        await start_unit_states(systemd_buses())
+
+    system = _unit_states.get("system")
+    if system is not None and system.usable():
+        total_statuses = system.statuses()
+        failed = system.failed()
+    else:
+        total_statuses = await get_service_statuses(
+            "systemctl list-units --type=service --no-legend --no-pager | awk '{print $4}'"
+        )
+        failed = []
 
-    # user_statuses = await get_service_statuses(
-    #     "systemctl --user list-units --type=service --no-legend --no-pager | awk '{print $4}'"
-    # )
+    user = _unit_states.get("user")
+    if user is not None and user.usable():
+        total_statuses += user.statuses()
+        failed += user.failed()
 
-    total_statuses = system_statuses  # + user_statuses
     total_count = sum(total_statuses.values())
 
-    return {"total": total_count, "breakdown": dict(total_statuses)}
+    return {"total": total_count, "breakdown": dict(total_statuses), "failed": failed}
 
 
 def time_ago(ts):
@@ -711,34 +1166,113 @@ def time_ago(ts):
         return f"{delta // 86400}d ago"
 
 
-async def get_updates():
+def updates_pending() -> str:
+    return f"\n{colors.bland_t}The updates status has not yet refreshed. Check back later.{colors.endc}\n"
+
+
+def map_snapshot() -> None:
+    with open(SNAPSHOT_FILE, "rb") as f:
+        snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, _, length = SNAPSHOT_HEADER.unpack_from(snapshot)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        snapshot.close()
+        raise ValueError("Unsupported snapshot format")
+
+    if "map" in _snapshot:
+        _snapshot["map"].close()
+    _snapshot["map"] = snapshot
+    _snapshot["generation"] = snapshot[SNAPSHOT_GENERATION]
+    _snapshot["data"] = json.loads(
+        snapshot[SNAPSHOT_HEADER.size : SNAPSHOT_HEADER.size + length]
+    )
+
+
+def load_snapshot() -> None:
     try:
-        with open(CACHE_FILE, "r") as f:
-            data = json.load(f)
-            updates = data.get("updates")
-            devel_updates = data.get("devel_updates")
-            news = data.get("news")
-            updrecommends = data.get("updrecommends", "Unknown")
-            timestamp = data.get("timestamp")
-            smart = data.get("smart")
-            msgs = []
-
-            if shutil.which("yay") is None:
-                msgs.append(
-                    "Install `yay` to view development package updates during login.\n"
-                )
-            ago = time_ago(timestamp)
+        map_snapshot()
+    except FileNotFoundError:
+        with open(CACHE_FILE, "r") as f:  # Server predates snapshots
+            _snapshot["data"] = json.load(f)
+    _snapshot["serial"] = _snapshot.get("serial", 0) + 1
 
-            return [
-                updates,
-                devel_updates,
-                news,
-                updrecommends,
-                [f"{colors.bland_t}(Latest check was {ago}){colors.endc}"] + msgs,
-                smart,
-            ]
+
+def watch_snapshot() -> None:
+    # Invalidate the decoded snapshot only when the server publishes a new
+    # one, instead of checking for it on every refresh.
+    try:
+        import pyinotify
+    except ImportError:
+        return
+    names = {os.path.basename(SNAPSHOT_FILE), os.path.basename(CACHE_FILE)}
+
+    def invalidate(event) -> None:
+        if event.name in names:
+            _snapshot["dirty"] = True
+
+    try:
+        wm = pyinotify.WatchManager()
+        notifier = pyinotify.AsyncioNotifier(
+            wm, asyncio.get_running_loop(), default_proc_fun=invalidate
+        )
+        if wm.add_watch(
+            os.path.dirname(SNAPSHOT_FILE),
+            pyinotify.IN_MOVED_TO | pyinotify.IN_CLOSE_WRITE,
+            quiet=False,
+        ):
+            _snapshot["notifier"] = notifier
+            _snapshot["dirty"] = True
+    except Exception:
+        pass  # Out of watches, compare generations instead
+
+
+def snapshot_changed() -> bool:
+    if "data" not in _snapshot:
+        return True
+    if "notifier" in _snapshot:
+        return _snapshot.pop("dirty", False)
+    # The server bumps the generation of the file it replaces
+    return (
+        "map" not in _snapshot
+        or _snapshot["map"][SNAPSHOT_GENERATION] != _snapshot["generation"]
+    )
+
+
+def read_snapshot() -> dict:
+    if snapshot_changed():
+        load_snapshot()
+    return _snapshot["data"]
+
+
+@collector("updates")
+def get_updates():
+    try:
+        data = read_snapshot()
+        updates = data.get("updates")
+        devel_updates = data.get("devel_updates")
+        news = data.get("news")
+        updrecommends = data.get("updrecommends", "Unknown")
+        timestamp = data.get("timestamp")
+        smart = data.get("smart")
+        msgs = []
+
+        if shutil.which("yay") is None:
+            msgs.append(
+                "Install `yay` to view development package updates during login.\n"
+            )
+        ago = time_ago(timestamp)
+
+        return [
+            updates,
+            devel_updates,
+            news,
+            updrecommends,
+            [f"{colors.bland_t}(Latest check was {ago}){colors.endc}"] + msgs,
+            smart,
+            _snapshot["serial"],
+            data.get("stale", {}),
+        ]
     except Exception as err:
-        return f"\n{colors.bland_t}The updates status has not yet refreshed. Check back later.{colors.endc}\n"
+        return updates_pending()
 
 
 def detect_install_device() -> str:
@@ -860,11 +1394,85 @@ def animation() -> str:
     return f"{colors.bland_t}[ {inner} ]{colors.endc}"
 
 
+def cached_section(name: str, key, render, updates) -> list:
+    # Sections fed by the server snapshot only change when it does
+    entry = _sections.get(name)
+    if entry is None or entry[0] != key:
+        entry = _sections[name] = (key, render(updates))
+    return entry[1]
+
+
+def updates_section(updates) -> list:
+    upd_str = ""
+    if isinstance(updates, list):
+        if updates[0] and not updates[1]:
+            upd_str = f"\n{colors.bold}{colors.cyan_t}{updates[0]} updates available.{colors.endc} "
+        elif updates[0] and updates[1]:
+            upd_str = f"\n{colors.bold}{colors.cyan_t}{updates[0] + updates[1]} updates available, of which {updates[1]} are development packages.{colors.endc}\n"
+        elif updates[1]:
+            upd_str = f"\n{colors.bold}{colors.cyan_t}{updates[1]} development updates available.{colors.endc}\n"
+        else:
+            upd_str = f"\n{colors.accent2 if colors.accent2 != colors.yellow_t else colors.green_t}You are up to date!{colors.endc} "
+        for i in updates[4]:
+            upd_str += i + "\n"
+        if (updates[0] or updates[1]) and updates[3] != "Unknown":
+            upd_str += f"{colors.accent}Should you update:{colors.endc} {updates[3]}"
+            if "updrecommends" in updates[7]:
+                upd_str += f" {colors.bland_t}(as of {stale_date(updates[7]['updrecommends'])}){colors.endc}"
+            upd_str += "\n"
+
+    elif isinstance(updates, str):
+        upd_str = updates
+
+    if upd_str:
+        return [upd_str + "\n"]
+    return []
+
+
+def stale_date(ts) -> str:
+    return datetime.fromtimestamp(ts).strftime("%a %d %b @ %H:%M")
+
+
+def news_section(updates) -> list:
+    if isinstance(updates, list):
+        news = updates[2]
+        if news and "news" in updates[7]:
+            return [
+                news,
+                f"{colors.bland_t}(Could not refresh news, showing the copy from {stale_date(updates[7]['news'])}){colors.endc}\n",
+                "\n",
+            ]
+        return [(news if news else "Failed to fetch news.\n"), "\n"]
+    return ["Failed to fetch news.", "\n", "\n"]
+
+
+def smart_section(updates) -> list:
+    msg = []
+    show_url = False
+    if isinstance(updates[5], dict):
+        for drive in updates[5].keys():
+            state = updates[5][drive]
+            if state == "WARN":
+                msg.append(
+                    f'{colors.bold}{colors.yellow_t}Drive "{drive}" reliability compromised - Backup your data{colors.endc}\n'
+                )
+                show_url = True
+            elif state == "CRIT":
+                msg.append(
+                    f'{colors.bold}{colors.red_t}DRIVE "{drive}" CRITICAL HEALTH - BACKUP YOUR DATA{colors.endc}\n'
+                )
+                show_url = True
+
+    if show_url:
+        msg.append(
+            f"\n{colors.bold}For more information, visit:\n{colors.blue_t}https://wiki.bredos.org/how-to/disk-failure{colors.endc}\n\n"
+        )
+    return msg
+
+
 async def main() -> None:
     global awidth, tix
-    info_task = get_system_info()
-    services_task = count_failed_systemd()
-    updates_task = get_updates()
+    await run_collectors()
 
     device = None
     sbc_declared = detect_install_device()
@@ -873,7 +1481,7 @@ async def main() -> None:
     else:
         device = sbc_declared
 
-    system_info = await info_task
+    system_info = get_system_info()
     msg = []
 
     msg.append(
@@ -905,7 +1513,6 @@ async def main() -> None:
     memory_str = f"{colors.accent if os.geteuid() else colors.red_t}Memory:{colors.endc} {system_info['memory_usage']} of {system_info['total_memory']} used"
 
     swap_str = ""
-    upd_str = ""
 
     splitter = True
     last = memory_str
@@ -969,11 +1576,14 @@ async def main() -> None:
                     splitter = False
             if splitter:
                 msg.append(seperator(last, collumns))
-            dstr = (
-                str(system_info["disks"][disk][0])
-                + "% of "
-                + human_readable(system_info["disks"][disk][1])
-            )
+            if system_info["disks"][disk][0] is None:
+                dstr = f"{colors.warning}stale{colors.endc}"
+            else:
+                dstr = (
+                    str(system_info["disks"][disk][0])
+                    + "% of "
+                    + human_readable(system_info["disks"][disk][1])
+                )
             last = f"{colors.accent if os.geteuid() else colors.red_t}{disk}:{colors.endc} {dstr}"
             msg.append(last)
             if splitter:
@@ -983,30 +1593,17 @@ async def main() -> None:
     if splitter:
         msg.append("\n")
 
-    updates = await updates_task
+    updates = _collected["updates"]
+    if updates is None:
+        updates = updates_pending()
 
-    if not hush_updates:
-        if isinstance(updates, list):
-            if updates[0] and not updates[1]:
-                upd_str = f"\n{colors.bold}{colors.cyan_t}{updates[0]} updates available.{colors.endc} "
-            elif updates[0] and updates[1]:
-                upd_str = f"\n{colors.bold}{colors.cyan_t}{updates[0] + updates[1]} updates available, of which {updates[1]} are development packages.{colors.endc}\n"
-            elif updates[1]:
-                upd_str = f"\n{colors.bold}{colors.cyan_t}{updates[1]} development updates available.{colors.endc}\n"
-            else:
-                upd_str = f"\n{colors.accent2 if colors.accent2 != colors.yellow_t else colors.green_t}You are up to date!{colors.endc} "
-            for i in updates[4]:
-                upd_str += i + "\n"
-            if (updates[0] or updates[1]) and updates[3] != "Unknown":
-                upd_str += (
-                    f"{colors.accent}Should you update:{colors.endc} {updates[3]}\n"
-                )
-
-        elif isinstance(updates, str):
-            upd_str = updates
+    if isinstance(updates, list):
+        serial, checked = updates[6], tuple(updates[4])
+    else:
+        serial = checked = updates
 
-        if upd_str:
-            msg.append(upd_str + "\n")
+    if not hush_updates:
+        msg += cached_section("updates", (serial, checked), updates_section, updates)
 
     if os.getlogin() == "bred" and os.path.exists("/usr/bin/Bakery"):
         msg.append(f"{colors.yellow_t}Setup is {colors.bold}INCOMPLETE{colors.endc}!\n")
@@ -1018,32 +1615,10 @@ async def main() -> None:
         if not hush_news:
             if hush_updates:
                 msg.append("\n")
-            if isinstance(updates, list):
-                news = updates[2]
-                msg += [(news if news else "Failed to fetch news.\n"), "\n"]
-            else:
-                msg += ["Failed to fetch news.", "\n", "\n"]
+            msg += cached_section("news", serial, news_section, updates)
 
-    show_url = False
     if not hush_smart:
-        if isinstance(updates[5], dict):
-            for drive in updates[5].keys():
-                state = updates[5][drive]
-                if state == "WARN":
-                    msg.append(
-                        f'{colors.bold}{colors.yellow_t}Drive "{drive}" reliability compromised - Backup your data{colors.endc}\n'
-                    )
-                    show_url = True
-                elif state == "CRIT":
-                    msg.append(
-                        f'{colors.bold}{colors.red_t}DRIVE "{drive}" CRITICAL HEALTH - BACKUP YOUR DATA{colors.endc}\n'
-                    )
-                    show_url = True
-
-        if show_url:
-            msg.append(
-                f"\n{colors.bold}For more information, visit:\n{colors.blue_t}https://wiki.bredos.org/how-to/disk-failure{colors.endc}\n\n"
-            )
+        msg += cached_section("smart", serial, smart_section, updates)
 
     if not os.geteuid():
         msg.append(
@@ -1054,10 +1629,12 @@ async def main() -> None:
             + "\n"
         )
 
-    services = await services_task
+    services = _collected["services"]
     if hush_updates and hush_news:
         msg.append("\n")
-    if not services["total"]:
+    if services is None:
+        msg.append(f"{colors.bland_t}Service status unavailable.{colors.endc}\n")
+    elif not services["total"]:
         msg.append(
             f"{colors.bold}{colors.accent2 if colors.accent2 != colors.yellow_t else colors.green_t}System is operating normally.{colors.endc}\n"
         )
@@ -1065,8 +1642,11 @@ async def main() -> None:
         for i in services["breakdown"].keys():
             n = services["breakdown"][i]
             if i == "failed":
+                names = ""
+                if services["failed"]:
+                    names = f" {colors.bland_t}({', '.join(services['failed'])}){colors.endc}"
                 msg.append(
-                    f"{colors.bold}{colors.red_t}{n}{colors.endc} services have {colors.bold}{colors.red_t}{i}{colors.endc}\n"
+                    f"{colors.bold}{colors.red_t}{n}{colors.endc} services have {colors.bold}{colors.red_t}{i}{colors.endc}{names}\n"
                 )
             else:
                 msg.append(
@@ -1108,9 +1688,10 @@ async def delay(duration: float) -> None:
 
 async def suspend(until: float) -> None:
     while until > monotonic():
-        stdout.write(f"\033[1F\033[2K{animation()}\n")
-        stdout.flush()
-        await delay(Time_Tick)
+        if last_lines and frame_allowed():
+            draw(last_lines[:-1] + [animation()])
+        # Never past `until`, keys are still read at the usual pace
+        await delay(min(max(_frames["tick"], Time_Tick), until - monotonic()))
 
 
 def shell_inject(text: str) -> bool:
@@ -1176,6 +1757,7 @@ async def loop_main() -> None:
             path = f"/tmp/news_run_{os.getuid()}.txt"
             with open(path, "w") as f:
                 f.write(str(int(time())))
+            startup_report()
         except KeyboardInterrupt:
             pass
         except:
@@ -1183,6 +1765,8 @@ async def loop_main() -> None:
 
         if _run:
             try:
+                import subprocess
+
                 subprocess.run(_run)
                 kill_parent()
             except KeyboardInterrupt:
@@ -1190,6 +1774,8 @@ async def loop_main() -> None:
             except:
                 pass
 
+        if budget_mode:
+            os._exit(0 if startup_within_budget() else 1)
         os._exit(0)
 
     signal.signal(signal.SIGINT, handle_exit)
@@ -1200,6 +1786,12 @@ async def loop_main() -> None:
         while True:
             stamp = monotonic()
             await main()
+            if "first frame" not in _startup:
+                startup_mark("first frame")
+                if budget_mode:
+                    handle_exit()
+                # Not needed for the first frame, the generation compare is
+                watch_snapshot()
             for _ in range(20):
                 dr, _, _ = select.select([stdin], [], [], 0)
                 if dr != []:
@@ -1237,20 +1829,45 @@ Hush_Smart = None
 Time_Tick = 0.1
 Time_Refresh = 0.25
 Onetime = False
+Refresh_Intervals = {}
 
 shortcuts = {}
 
+
+def compile_newsrc(path: str):
+    # Compiled once per edit, the code object is kept in NEWSRC_CACHE
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size, implementation.cache_tag)
+    try:
+        with open(NEWSRC_CACHE, "rb") as f:
+            cached_key, code = marshal.load(f)
+        if cached_key == key:
+            return code
+    except Exception:
+        pass
+    with open(path) as f:
+        code = compile(f.read(), path, "exec")
+    try:
+        os.makedirs(os.path.dirname(NEWSRC_CACHE), exist_ok=True)
+        tmp = f"{NEWSRC_CACHE}.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            marshal.dump((key, code), f)
+        os.replace(tmp, NEWSRC_CACHE)
+    except OSError:
+        pass
+    return code
+
+
 newsrc_path = os.path.expanduser("~/.newsrc")
 if os.path.isfile(newsrc_path):
-    with open(newsrc_path) as f:
-        try:
-            exec(f.read(), globals())
-        except KeyboardInterrupt:
-            print(
-                "Ctrl-C detected while loading `~/.newsrc`, experiencing severe brain damage."
-            )
-        except:
-            print("Exception while loading `~/.newsrc`, ignoring.")
+    try:
+        exec(compile_newsrc(newsrc_path), globals())
+    except KeyboardInterrupt:
+        print(
+            "Ctrl-C detected while loading `~/.newsrc`, experiencing severe brain damage."
+        )
+    except:
+        print("Exception while loading `~/.newsrc`, ignoring.")
 else:  # Install and run default configuration
     try:
         with open(newsrc_path, "w") as f:
@@ -1287,6 +1904,13 @@ if not (isinstance(Time_Tick, float) or isinstance(Time_Tick, int)):
 if not (isinstance(Time_Refresh, float) or isinstance(Time_Refresh, int)):
     Time_Refresh = 0.25
 
+if isinstance(Refresh_Intervals, dict):
+    for source, interval in Refresh_Intervals.items():
+        if source in refresh_intervals and isinstance(interval, (float, int)):
+            refresh_intervals[source] = interval
+
+startup_mark("config")
+
 # Main event loop
 if __name__ == "__main__":
     asyncio.run(loop_main())
@@ -1,8 +1,9 @@
 #!/usr/bin/env -S python3 -u
-import os, re, json, time, glob, sys, io, pwd
-import socket, subprocess, pyinotify, requests
-import platform, tomllib
-from datetime import datetime
+import os, re, json, time, glob, sys, io, pwd, struct
+import socket, subprocess, pyinotify, requests, threading
+import platform, tomllib, socketserver, tarfile, tempfile
+import gzip, lzma, bz2, signal, random
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Rebind stdout/stderr to unbuffered UTF-8 streams for systemd
 sys.stdout = io.TextIOWrapper(
@@ -14,43 +15,141 @@ sys.stderr = io.TextIOWrapper(
 
 
 CACHE_FILE = "/tmp/news_cache.json"
+SNAPSHOT_FILE = "/tmp/news_cache.bin"
+SOCKET_PATH = "/run/bredos-news.sock"
 WATCH_DIR = "/var/lib/pacman/"
 PACMAN_LOCK = WATCH_DIR + "db.lck"
+PACMAN_CONF = "/etc/pacman.conf"
+STATE_DIR = "/var/lib/bredos-news/"
+SYNC_DBPATH = STATE_DIR + "db/"
+HTTP_CACHE_FILE = STATE_DIR + "http_cache.json"
+SMART_CACHE_FILE = STATE_DIR + "smart_cache.json"
+INDEX_FILE = STATE_DIR + "local_index.json"
+VCS_SUFFIXES = ("-git", "-svn", "-hg", "-bzr", "-darcs", "-fossil", "-cvs")
+
+NEWS_URL = "https://raw.githubusercontent.com/BredOS/news/refs/heads/main/notice.txt"
+UPD_RECOMMENDS_URL = (
+    "https://raw.githubusercontent.com/BredOS/news/refs/heads/main/upd_recommends.toml"
+)
 
 RETRY_DELAY = 8
-NORMAL_DELAY = 1800
-MAX_RETRIES = 20
-WATCHDOG_TIMEOUT = 5
-
-MUTEX_LOCK = False
-
-_last_run_data = {}
-
-
-def once_per_day(func):
-    tag = func.__name__
-
-    def wrapper(*args, **kwargs):
-        now = datetime.now()
-        entry = _last_run_data.get(tag)
-
-        if entry:
-            last_run, cached_result = entry
-            if now.date() == last_run.date():
-                print(f"[once_per_day_cached] Skipping {tag}, returning cached result.")
-                return cached_result
-
-        result = func(*args, **kwargs)
-        _last_run_data[tag] = (now, result)
-        return result
-
-    return wrapper
-
-
-@once_per_day
-def emmc_lifetime_estimation() -> dict:
-    results = {}
 
+# Each source is refreshed on its own interval (seconds), spread by
+# +-SCHEDULE_JITTER. A failed source is retried after SCHEDULE_RETRY,
+# doubling on every failure up to its interval. Sources in SCHEDULE_SPREAD
+# start somewhere in the first STARTUP_SPREAD seconds, so a fleet booted
+# together doesn't ask in lockstep.
+SCHEDULE = {
+    "updates": 1800,
+    "devel": 3600,
+    "news": 21600,
+    "upd_recommends": 21600,
+    "smart": 3600,
+}
+SCHEDULE_JITTER = 0.2
+SCHEDULE_RETRY = 60
+SCHEDULE_SPREAD = ("news", "upd_recommends")
+STARTUP_SPREAD = 300
+# An API check only forces CHECK_SOURCES, and only those that haven't run
+# in the last CHECK_MIN_AGE seconds
+CHECK_SOURCES = ("updates", "devel")
+CHECK_MIN_AGE = 60
+
+# Commands get COMMAND_BUDGET seconds in total. The first attempt may take
+# WATCHDOG_TIMEOUT, every retry doubles that and the pause before it, which
+# starts at COMMAND_BACKOFF.
+COMMAND_BUDGET = 60
+WATCHDOG_TIMEOUT = 5
+COMMAND_BACKOFF = 0.5
+COMMAND_NICE = 19
+
+# Seconds of pacman db silence before a burst of events triggers a check
+QUIET_PERIOD = 2
+# Safety net for a db.lck whose removal we never got an event for
+LOCK_RECHECK = 30
+
+# rtnetlink multicast groups: links, IPv4/IPv6 addresses and routes
+RTNL_GROUPS = 0x1 | 0x10 | 0x40 | 0x100 | 0x400
+RTF_UP = 0x1
+RTF_REJECT = 0x200
+
+# Update check stages run in parallel, each with its own deadline (seconds)
+STAGE_WORKERS = 4
+STAGE_TIMEOUTS = {
+    "updates": 150,
+    "devel": 300,
+    "news": 20,
+    "upd_recommends": 20,
+    "smart": 120,
+}
+# The sync and the checkupdates fallback share UPDATES_BUDGET, kept under
+# the stage deadline so a stage is never left running into the next check.
+# The sync may use up to SYNC_BUDGET of it.
+UPDATES_BUDGET = 135
+SYNC_BUDGET = 90
+
+# Devel packages: upstream heads are resolved in parallel, and reused for
+# DEVEL_HEAD_TTL seconds (git ls-remote timeout is DEVEL_TIMEOUT)
+DEVEL_WORKERS = 4
+DEVEL_HEAD_TTL = 900
+DEVEL_TIMEOUT = 20
+# vcs.json is user writable: only these transports, and plain ref names.
+# The functions take other schemes for checks against file:// repos.
+DEVEL_SCHEMES = ("https", "http", "git", "ssh")
+DEVEL_REF_RE = re.compile(r"[A-Za-z0-9_.][A-Za-z0-9_./-]*")
+
+AUR_RPC_URL = "https://aur.archlinux.org/rpc/v5/info"
+AUR_BATCH = 100
+
+# Drive health: seconds until a device is probed again, by its last status.
+# A device that was asleep or unreadable keeps its status for SMART_RETRY.
+# The scan and the probes get SMART_DEADLINE together (keep it under
+# STAGE_TIMEOUTS["smart"]), the scan at most SMART_SCAN_BUDGET of it. Probes
+# still running then are left out of the report, and those devices stay due
+# but aren't probed again until the running probe ends.
+SMART_WORKERS = 4
+SMART_DEADLINE = 100
+SMART_SCAN_BUDGET = 10
+SMART_TTLS = {"OK": 86400, "WARN": 21600, "CRIT": 3600}
+SMART_RETRY = 3600
+# eMMC PRE_EOL_INFO, reserved blocks consumed: under 80%, 80%, 90%
+EMMC_PRE_EOL = {1: "Normal", 2: "Warning", 3: "Urgent"}
+
+# Snapshot header: magic, format version, generation, payload length.
+# Keep in sync with the client.
+SNAPSHOT_MAGIC = b"BNEWS\0"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<6sHQI")
+SNAPSHOT_GENERATION = struct.Struct("<Q")
+SNAPSHOT_GENERATION_OFFSET = 8
+
+_command_stats = {}
+_command_stats_lock = threading.Lock()
+
+_session = requests.Session()
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+_sync_db_cache = {}
+
+_smart_cache = None
+_smart_cache_lock = threading.Lock()
+_smart_in_flight = set()
+
+_remote_heads = {}
+_remote_heads_lock = threading.Lock()
+
+_schedule = {}
+_schedule_lock = threading.Lock()
+_latest = {}
+
+_published = {}
+_subscribers = set()
+_subscribers_lock = threading.Lock()
+
+
+def emmc_devices() -> list:
+    devices = []
     for dev_path in glob.glob("/dev/mmcblk[0-9]"):
         devname = os.path.basename(dev_path)
         sys_dev_path = os.path.realpath(f"/sys/block/{devname}/device")
@@ -63,179 +162,939 @@ def emmc_lifetime_estimation() -> dict:
                 continue  # Not an eMMC device
         except FileNotFoundError:
             continue  # Unexpected sysfs layout, skip
+        devices.append(dev_path)
+    return devices
 
-        try:
-            output = subprocess.check_output(
-                ["mmc", "extcsd", "read", dev_path],
-                stderr=subprocess.DEVNULL,
-                text=True,
-            )
-        except subprocess.CalledProcessError:
-            continue  # command failed unexpectedly
 
-        match_a = re.search(
-            r"EXT_CSD_DEVICE_LIFE_TIME_EST_TYP_A\]:\s+0x([0-9A-Fa-f]+)", output
-        )
-        match_b = re.search(
-            r"EXT_CSD_DEVICE_LIFE_TIME_EST_TYP_B\]:\s+0x([0-9A-Fa-f]+)", output
-        )
-
-        if not match_a or not match_b:
-            continue  # could not parse values
+def emmc_wear(dev_path: str):
+    # Life time estimates A/B (0x01 per 10% used) and pre-EOL info, straight
+    # from sysfs when the kernel exposes them, else from the EXT_CSD via mmc
+    sys_dev_path = f"/sys/block/{os.path.basename(dev_path)}/device/"
+    try:
+        with open(sys_dev_path + "life_time") as f:
+            val_a, val_b = (int(v, 16) for v in f.read().split())
+        with open(sys_dev_path + "pre_eol_info") as f:
+            pre_eol = int(f.read(), 16)
+        return val_a, val_b, pre_eol
+    except (OSError, ValueError):
+        pass
 
-        val_a = int(match_a.group(1), 16)
-        val_b = int(match_b.group(1), 16)
+    try:
+        output = subprocess.check_output(
+            ["mmc", "extcsd", "read", dev_path],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None  # command failed unexpectedly
+
+    match_a = re.search(
+        r"EXT_CSD_DEVICE_LIFE_TIME_EST_TYP_A\]:\s+0x([0-9A-Fa-f]+)", output
+    )
+    match_b = re.search(
+        r"EXT_CSD_DEVICE_LIFE_TIME_EST_TYP_B\]:\s+0x([0-9A-Fa-f]+)", output
+    )
+    match_eol = re.search(r"EXT_CSD_PRE_EOL_INFO\]:\s+0x([0-9A-Fa-f]+)", output)
+
+    if not match_a or not match_b:
+        return None  # could not parse values
+
+    pre_eol = int(match_eol.group(1), 16) if match_eol else 0
+    return int(match_a.group(1), 16), int(match_b.group(1), 16), pre_eol
+
+
+def probe_emmc(dev: str):
+    wear = emmc_wear(dev)
+    if wear is None:
+        return None
+    val_a, val_b, pre_eol = wear
+
+    def hex_to_percent(val):
+        return min(val, 10) * 10  # clamp to 100%
+
+    percent = max(hex_to_percent(val_a), hex_to_percent(val_b))
+    print(
+        f"{dev}: life time used A {hex_to_percent(val_a)}%, "
+        f"B {hex_to_percent(val_b)}%, pre-EOL {EMMC_PRE_EOL.get(pre_eol, 'Undefined')}"
+    )
+    if percent > 75 or pre_eol == 3:
+        return "CRIT"
+    elif percent > 50 or pre_eol == 2:
+        return "WARN"
+    return "OK"
+
+
+def smart_devices() -> list:
+    # --scan lists devices without opening them
+    lines = run_command(["smartctl", "--scan"], budget=SMART_SCAN_BUDGET, timeout=10)
+    if lines is None:
+        raise RuntimeError("Failed to scan for SMART devices")
+    return [l.split()[0] for l in lines if not l.startswith("/dev/bus/")]
+
+
+def probe_smart(dev: str):
+    # -n standby leaves sleeping drives alone, they are retried later.
+    # smartctl's exit status is a bitmask, the JSON carries it too.
+    lines = run_command(
+        ["smartctl", "-n", "standby", "-j", "-A", "-H", dev],
+        budget=60,
+        timeout=30,
+        ok_codes=range(256),
+    )
+    if lines is None:
+        return None
+    try:
+        data = json.loads("\n".join(lines))
+    except ValueError:
+        return "CRIT"
+
+    # Check overall SMART support + health
+    smart = data.get("smart_status")
+    if smart is None and data.get("smartctl", {}).get("exit_status", 0) & 2:
+        return None  # In standby, or could not be opened
+    if not (smart or {}).get("passed", False):
+        return "CRIT"
+
+    # Look for reallocated sectors (ID 5)
+    reallocated = 0
+    attrs = data.get("ata_smart_attributes", {}).get("table", [])
+    for attr in attrs:
+        if attr.get("id") == 5:  # Reallocated_Sector_Ct
+            reallocated = attr.get("raw", {}).get("value", 0)
+            break
+
+    nvme = data.get("nvme_smart_health_information_log", {})
+    if nvme.get("percentage_used", 0) > 40:
+        reallocated = 1
+
+    return "WARN" if reallocated > 0 else "OK"
+
+
+def load_smart_cache() -> dict:
+    global _smart_cache
+    if _smart_cache is None:
+        try:
+            with open(SMART_CACHE_FILE) as f:
+                _smart_cache = json.load(f)
+        except (OSError, ValueError):
+            _smart_cache = {}
+    return _smart_cache
 
-        def hex_to_percent(val):
-            return min(val, 10) * 10  # clamp to 100%
 
-        percent = max(hex_to_percent(val_a), hex_to_percent(val_b))
-        results[dev_path] = percent
+def smart_health_report() -> dict:
+    # Results are kept on disk per device, only devices whose TTL ran out
+    # are probed, SMART_WORKERS at a time.
+    deadline = time.monotonic() + SMART_DEADLINE
+    probes = {dev: probe_smart for dev in smart_devices()}
+    probes.update({dev: probe_emmc for dev in emmc_devices()})
+    with _smart_cache_lock:
+        cache = load_smart_cache()
+        now = time.time()
+        due = [
+            dev
+            for dev in probes
+            if dev not in _smart_in_flight
+            and (dev not in cache or now - cache[dev]["checked"] >= cache[dev]["ttl"])
+        ]
+        _smart_in_flight.update(due)
+    if not due:
+        with _smart_cache_lock:
+            return {dev: cache[dev]["status"] for dev in probes if dev in cache}
+
+    def probe(dev: str):
+        try:
+            return probes[dev](dev)
+        finally:
+            with _smart_cache_lock:
+                _smart_in_flight.discard(dev)
+
+    pool = ThreadPoolExecutor(max_workers=SMART_WORKERS)
+    futures = {pool.submit(probe, dev): dev for dev in due}
+    done, _ = wait(futures, timeout=max(0, deadline - time.monotonic()))
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    with _smart_cache_lock:
+        for future, dev in futures.items():
+            if future.cancelled():
+                _smart_in_flight.discard(dev)  # Never started
+        for future in done:
+            dev = futures[future]
+            try:
+                status = future.result()
+            except Exception as err:
+                print(f"Probing {dev} failed: {err}")
+                status = None
+            if status is not None:
+                cache[dev] = {
+                    "status": status,
+                    "checked": now,
+                    "ttl": SMART_TTLS[status],
+                }
+            elif dev in cache:
+                cache[dev].update(checked=now, ttl=SMART_RETRY)
+        if len(done) < len(futures):
+            print(f"SMART probes of {len(futures) - len(done)} devices ran late")
+        for dev in cache.keys() - probes.keys():
+            del cache[dev]
+        try:
+            write_state(SMART_CACHE_FILE, cache)
+        except OSError as err:
+            print(f"Could not save the SMART cache: {err}")
+        return {dev: cache[dev]["status"] for dev in probes if dev in cache}
 
-    return results
 
+def has_internet() -> bool:
+    try:
+        with socket.create_connection(("9.9.9.9", 53), timeout=2):
+            return True
+    except OSError:
+        return False
 
-@once_per_day
-def smart_health_report() -> dict:
-    devices = []
-    result = {}
 
+def has_default_route() -> bool:
     try:
-        scan_output = subprocess.check_output(["smartctl", "--scan-open"], text=True)
-        devices = [line.split()[0] for line in scan_output.splitlines()]
-        filtered_devs = []
-        for i in devices:
-            if i.startswith("/dev/bus/"):
-                filtered_devs.append(i)
-        for i in filtered_devs:
-            devices.remove(i)
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError("Failed to scan for SMART devices") from e
-
-    for dev in devices:
-        try:
-            output = subprocess.check_output(["smartctl", "-Aj", "-Hj", dev], text=True)
-            data = json.loads(output)
-        except (subprocess.CalledProcessError, json.JSONDecodeError):
-            result[dev] = "CRIT"
-            continue
+        with open("/proc/net/route") as f:
+            for line in f.readlines()[1:]:
+                fields = line.split()
+                if fields[1] == fields[7] == "00000000" and int(fields[3], 16) & RTF_UP:
+                    return True
+    except (OSError, IndexError, ValueError):
+        return True  # Can't tell, let the check find out
+    try:
+        with open("/proc/net/ipv6_route") as f:
+            for line in f:
+                fields = line.split()
+                flags = int(fields[8], 16)
+                if (
+                    fields[0] == "0" * 32
+                    and fields[1] == "00"
+                    and fields[9] != "lo"
+                    and flags & RTF_UP
+                    and not flags & RTF_REJECT
+                ):
+                    return True
+    except (OSError, IndexError, ValueError):
+        pass
+    return False
 
-        # Check overall SMART support + health
-        smart = data.get("smart_status", {})
-        if not smart.get("passed", False):
-            result[dev] = "CRIT"
-            continue
 
-        # Look for reallocated sectors (ID 5)
-        reallocated = 0
-        attrs = data.get("ata_smart_attributes", {}).get("table", [])
-        for attr in attrs:
-            if attr.get("id") == 5:  # Reallocated_Sector_Ct
-                reallocated = attr.get("raw", {}).get("value", 0)
-                break
+def netlink_events():
+    # One item per batch of rtnetlink link/address/route messages. The socket
+    # is opened right away, so a missing rtnetlink shows up here.
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    sock.bind((0, RTNL_GROUPS))
 
-        attrs = data.get("nvme_smart_health_information_log", {}).get("table", [])
-        if "percentage_used" in attrs and attrs["percentage_used"] > 40:
-            reallocated = 1
+    def events():
+        with sock:
+            while True:
+                try:
+                    sock.recv(65536)
+                except OSError:  # ENOBUFS, we fell behind, still worth a look
+                    pass
+                yield
 
-        if reallocated > 0:
-            result[dev] = "WARN"
-        else:
-            result[dev] = "OK"
-
-    eMMCs = emmc_lifetime_estimation()
-    for mmc in eMMCs:
-        if eMMCs[mmc] > 75:
-            result[mmc] = "CRIT"
-        elif eMMCs[mmc] > 50:
-            result[mmc] = "WARN"
-        else:
-            result[mmc] = "OK"
+    return events()
 
-    return result
 
+def record_command(name: str, outcome: str, seconds: float) -> None:
+    with _command_stats_lock:
+        stats = _command_stats.setdefault(
+            name, {"ok": 0, "timeout": 0, "error": 0, "seconds": 0.0}
+        )
+        stats[outcome] += 1
+        stats["seconds"] += seconds
+        stats["last_seconds"] = seconds
 
-def has_internet() -> bool:
-    try:
-        socket.setdefaulttimeout(2)
-        socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect(("9.9.9.9", 53))
-        return True
-    except Exception:
-        return False
+
+def command_stats() -> dict:
+    with _command_stats_lock:
+        return {name: dict(stats) for name, stats in _command_stats.items()}
 
 
-def run_command(cmd):
-    for _ in range(MAX_RETRIES):
+def kill_group(proc: subprocess.Popen) -> None:
+    # The command runs in its own session, take its children down with it
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    proc.wait()
+    proc.stdout.close()
+
+
+def run_command(
+    cmd,
+    budget: float = COMMAND_BUDGET,
+    timeout: float = WATCHDOG_TIMEOUT,
+    env=None,
+    ok_codes=(0,),
+    user: int = None,
+):
+    # `user` runs the command under that uid, with its primary group only
+    creds = {}
+    if user is not None and user != os.geteuid():
+        pw = pwd.getpwuid(user)
+        creds = {"user": user, "group": pw.pw_gid, "extra_groups": []}
+    deadline = time.monotonic() + budget
+    delay = COMMAND_BACKOFF
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        start = time.monotonic()
         try:
             proc = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
-                preexec_fn=lambda: os.nice(20),
+                start_new_session=True,
+                env=env,
+                **creds,
             )
-            stdout, _ = proc.communicate(timeout=WATCHDOG_TIMEOUT)
-            lines = stdout.decode().strip().splitlines()
-            return [l for l in lines if l]
-        except Exception:
-            time.sleep(1)
-    return None
+        except (FileNotFoundError, PermissionError):
+            record_command(cmd[0], "error", time.monotonic() - start)
+            return None  # Retrying won't make it appear
+        except OSError:
+            proc = None
+        if proc is not None:
+            # Lowered after the spawn, a preexec_fn forces the slow fork path
+            try:
+                os.setpriority(os.PRIO_PGRP, proc.pid, COMMAND_NICE)
+            except OSError:
+                pass
+            try:
+                stdout, _ = proc.communicate(timeout=min(timeout, remaining))
+                if proc.returncode not in ok_codes:
+                    record_command(cmd[0], "error", time.monotonic() - start)
+                    return None
+                record_command(cmd[0], "ok", time.monotonic() - start)
+                lines = stdout.decode(errors="replace").strip().splitlines()
+                return [l for l in lines if l]
+            except subprocess.TimeoutExpired:
+                kill_group(proc)
+                record_command(cmd[0], "timeout", time.monotonic() - start)
+        else:
+            record_command(cmd[0], "error", time.monotonic() - start)
+        time.sleep(max(0, min(delay, deadline - time.monotonic())))
+        timeout *= 2
+        delay *= 2
+
+
+# Package db `desc` entries, sync dbs carry a %BASE% between the two
+DESC_RE = re.compile(
+    rb"%NAME%\n([^\n]+)\n\n(?:%BASE%\n[^\n]*\n\n)?%VERSION%\n([^\n]+)\n"
+)
+DESC_FIELD_RE = re.compile(rb"%([A-Z0-9]+)%\n([^\n]*)\n")
+
+
+def rpmvercmp(a: str, b: str) -> int:
+    # Straight port of libalpm's rpmvercmp()
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    i = j = 0
+    while i < la and j < lb:
+        si, sj = i, j
+        while i < la and not (a[i].isascii() and a[i].isalnum()):
+            i += 1
+        while j < lb and not (b[j].isascii() and b[j].isalnum()):
+            j += 1
+        if i >= la or j >= lb:
+            break
+        # Differing separator lengths decide on their own
+        if i - si != j - sj:
+            return -1 if i - si < j - sj else 1
+
+        si, sj = i, j
+        isnum = a[i].isdigit()
+        if isnum:
+            while i < la and a[i].isdigit():
+                i += 1
+            while j < lb and b[j].isdigit():
+                j += 1
+        else:
+            while i < la and a[i].isascii() and a[i].isalpha():
+                i += 1
+            while j < lb and b[j].isascii() and b[j].isalpha():
+                j += 1
+        one, two = a[si:i], b[sj:j]
+
+        # Numeric segments are always newer than alpha ones
+        if not two:
+            return 1 if isnum else -1
+        if isnum:
+            one, two = one.lstrip("0"), two.lstrip("0")
+            if len(one) != len(two):
+                return 1 if len(one) > len(two) else -1
+        if one != two:
+            return -1 if one < two else 1
+
+    if i >= la and j >= lb:
+        return 0
+    # A remaining alpha string never beats an empty one
+    rest_a, rest_b = a[i:], b[j:]
+    if (not rest_a and not rest_b[:1].isalpha()) or rest_a[:1].isalpha():
+        return -1
+    return 1
+
+
+def parse_evr(evr: str) -> tuple:
+    s = 0
+    while s < len(evr) and evr[s].isdigit():
+        s += 1
+    se = evr.rfind("-", s)
+
+    epoch, start = "0", 0
+    if evr[s : s + 1] == ":":
+        epoch, start = evr[:s] or "0", s + 1
+    if se == -1:
+        return epoch, evr[start:], None
+    return epoch, evr[start:se], evr[se + 1 :]
+
+
+def vercmp(a: str, b: str) -> int:
+    # Same result as pacman's vercmp(8)
+    if a == b:
+        return 0
+    epoch_a, ver_a, rel_a = parse_evr(a)
+    epoch_b, ver_b, rel_b = parse_evr(b)
+    ret = rpmvercmp(epoch_a, epoch_b)
+    if ret == 0:
+        ret = rpmvercmp(ver_a, ver_b)
+        if ret == 0 and rel_a is not None and rel_b is not None:
+            ret = rpmvercmp(rel_a, rel_b)
+    return ret
+
+
+def configured_repos(conf: str = PACMAN_CONF) -> list:
+    repos = []
+    with open(conf) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("[") and line.endswith("]") and line != "[options]":
+                repos.append(line[1:-1])
+    return repos
+
+
+def local_packages(dbpath: str) -> dict:
+    packages = {}
+    local = os.path.join(dbpath, "local")
+    for entry in os.scandir(local):
+        try:
+            with open(os.path.join(entry.path, "desc"), "rb") as f:
+                match = DESC_RE.search(f.read())
+        except (NotADirectoryError, FileNotFoundError):
+            continue
+        if match:
+            packages[match.group(1).decode()] = match.group(2).decode()
+    return packages
+
+
+class PackageIndex:
+    # Installed packages keyed by their directory in local/, as
+    # [name, version, install size, vcs]. Kept on disk between runs, and
+    # after the first listdir reconcile only the directories reported by
+    # inotify are read again.
+    def __init__(self, local: str = WATCH_DIR + "local", path: str = INDEX_FILE):
+        self.local = os.path.normpath(local)
+        self.path = path
+        self.entries = None
+        self.dirty = set()
+        self.reconciled = False
+        self.lock = threading.Lock()
+
+    def touch(self, dirname: str) -> None:
+        with self.lock:
+            self.dirty.add(dirname)
+
+    def invalidate(self) -> None:
+        # Events were lost, fall back to a full reconcile
+        with self.lock:
+            self.reconciled = False
+
+    def read(self, dirname: str):
+        try:
+            with open(os.path.join(self.local, dirname, "desc"), "rb") as f:
+                fields = dict(DESC_FIELD_RE.findall(f.read()))
+        except (NotADirectoryError, FileNotFoundError):
+            return None
+        if b"NAME" not in fields or b"VERSION" not in fields:
+            return None  # Still being written
+        name = fields[b"NAME"].decode()
+        size = int(fields.get(b"SIZE", b"0") or 0)
+        return [name, fields[b"VERSION"].decode(), size, name.endswith(VCS_SUFFIXES)]
+
+    def sync(self) -> dict:
+        with self.lock:
+            changed = False
+            if self.entries is None:
+                try:
+                    with open(self.path) as f:
+                        self.entries = json.load(f)["packages"]
+                    if any(len(entry) != 4 for entry in self.entries.values()):
+                        raise ValueError("Old index format")
+                except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                    self.entries = {}
+                    changed = True
+            if not self.reconciled:
+                present = set(os.listdir(self.local))
+                for dirname in self.entries.keys() - present:
+                    del self.entries[dirname]
+                    changed = True
+                self.dirty |= present - self.entries.keys()
+                self.reconciled = True
+
+            pending = set()
+            for dirname in self.dirty:
+                entry = self.read(dirname)
+                if entry is not None:
+                    self.entries[dirname] = entry
+                elif os.path.isdir(os.path.join(self.local, dirname)):
+                    pending.add(dirname)
+                    continue
+                else:
+                    self.entries.pop(dirname, None)
+                changed = True
+            self.dirty = pending
+
+            if changed:
+                try:
+                    write_state(self.path, {"packages": self.entries})
+                except OSError as err:
+                    print(f"Could not save the package index: {err}")
+            return dict(self.entries)
+
+    def packages(self) -> dict:
+        return {name: version for name, version, _, _ in self.sync().values()}
+
+    def sizes(self) -> dict:
+        return {name: size for name, _, size, _ in self.sync().values()}
+
+    def vcs_packages(self) -> dict:
+        return {name: version for name, version, _, vcs in self.sync().values() if vcs}
+
+
+_package_index = PackageIndex()
+
+
+def read_db_archive(path: str) -> bytes:
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(b"\x1f\x8b"):
+        return gzip.decompress(data)
+    if data.startswith(b"\xfd7zXZ\x00"):
+        return lzma.decompress(data)
+    if data.startswith(b"BZh"):
+        return bz2.decompress(data)
+    if data[257:262] == b"ustar":
+        return data
+    raise ValueError(f"Unsupported compression for {path}")
+
+
+def sync_packages(path: str) -> dict:
+    # The desc entries are scanned straight out of the decompressed tar,
+    # and kept until the db file changes.
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _sync_db_cache.get(path)
+    if cached is None or cached[0] != key:
+        packages = {
+            name.decode(): version.decode()
+            for name, version in DESC_RE.findall(read_db_archive(path))
+        }
+        cached = _sync_db_cache[path] = (key, packages)
+    return cached[1]
+
+
+def pending_updates(dbpath: str, repos: list = None, installed: dict = None) -> list:
+    # [(name, installed version, new version)], like `pacman -Qu`
+    if installed is None:
+        installed = local_packages(dbpath)
+    if repos is None:
+        repos = configured_repos()
+    syncs = []
+    for repo in repos:
+        try:
+            syncs.append(sync_packages(os.path.join(dbpath, "sync", repo + ".db")))
+        except FileNotFoundError:
+            continue
+    if not syncs:
+        raise FileNotFoundError(f"No sync databases in {dbpath}")
+
+    updates = []
+    for name, version in installed.items():
+        for packages in syncs:  # First repo carrying it wins
+            if name in packages:
+                if vercmp(packages[name], version) > 0:
+                    updates.append((name, version, packages[name]))
+                break
+    return updates
+
+
+def sync_databases(budget: float = SYNC_BUDGET) -> bool:
+    # Private copy of the sync dbs, so the real ones are never touched
+    local = os.path.join(SYNC_DBPATH, "local")
+    os.makedirs(SYNC_DBPATH, exist_ok=True)
+    if not os.path.islink(local):
+        os.symlink(os.path.join(WATCH_DIR, "local"), local)
+    # Only left behind by a sync we killed, as checks never overlap
+    try:
+        os.remove(os.path.join(SYNC_DBPATH, "db.lck"))
+    except FileNotFoundError:
+        pass
+    res = run_command(
+        ["pacman", "-Sy", "--dbpath", SYNC_DBPATH, "--logfile", "/dev/null"],
+        budget=budget,
+        timeout=60,
+    )
+    return res is not None  # None on a timeout or a non-zero exit
 
 
 def get_updates():
-    res = run_command(["checkupdates"])
+    # A failed sync leaves stale (or on first boot no) dbs behind, which
+    # would read as "up to date"
+    deadline = time.monotonic() + UPDATES_BUDGET
+    if not sync_databases():
+        print("Syncing the package databases failed, using checkupdates")
+    else:
+        try:
+            return len(
+                pending_updates(SYNC_DBPATH, installed=_package_index.packages())
+            )
+        except Exception as err:
+            print(f"Native update check failed ({err}), using checkupdates")
+    # 2 is checkupdates for "no updates"
+    res = run_command(
+        ["checkupdates"],
+        budget=deadline - time.monotonic(),
+        timeout=30,
+        ok_codes=(0, 2),
+    )
     return len(res) if isinstance(res, list) else res
 
 
-def get_devel_updates():
-    users_with_yay = []
+def benchmark(count: int = 5000) -> None:
+    # Synthetic db: `count` installed packages, a tenth of them upgradable,
+    # in a sync db that also carries twice as many packages not installed.
+    with tempfile.TemporaryDirectory() as dbpath:
+        os.makedirs(os.path.join(dbpath, "local"))
+        os.makedirs(os.path.join(dbpath, "sync"))
+        with tarfile.open(os.path.join(dbpath, "sync", "core.db"), "w:gz") as db:
+            for i in range(count * 3):
+                name, version = f"pkg{i}", f"1:{i % 7}.{i % 13}.{i}-1"
+                if i < count:
+                    pkgdir = os.path.join(dbpath, "local", f"{name}-{version}")
+                    os.makedirs(pkgdir)
+                    with open(os.path.join(pkgdir, "desc"), "w") as f:
+                        f.write(f"%NAME%\n{name}\n\n%VERSION%\n{version}\n\n")
+                if i % 10 == 0:
+                    version = version[:-1] + "2"
+                desc = (
+                    f"%FILENAME%\n{name}-{version}-any.pkg.tar.zst\n\n"
+                    f"%NAME%\n{name}\n\n%BASE%\n{name}\n\n"
+                    f"%VERSION%\n{version}\n\n%DESC%\nSynthetic package\n\n"
+                ).encode()
+                info = tarfile.TarInfo(f"{name}-{version}/desc")
+                info.size = len(desc)
+                db.addfile(info, io.BytesIO(desc))
+
+        for run in ("cold", "warm"):
+            start = time.perf_counter()
+            updates = pending_updates(dbpath, ["core"])
+            elapsed = time.perf_counter() - start
+            print(
+                f"{run}: {len(updates)} of {count} packages upgradable in {elapsed * 1000:.1f}ms"
+            )
 
-    # Find all users with yay cache
-    for p in pwd.getpwall():
-        homedir = p.pw_dir
-        yay_cache = os.path.join(homedir, ".cache/yay")
-        if os.path.isdir(yay_cache):
-            users_with_yay.append((p.pw_name, homedir))
 
-    update_set = set()
+def yay_homes() -> list:
+    homes = {p.pw_dir for p in pwd.getpwall()}
+    return sorted(h for h in homes if os.path.isdir(os.path.join(h, ".cache/yay")))
 
-    # Step 2: Run yay -Qua --devel for each user
-    for username, _ in users_with_yay:
-        retries = 0
-        while retries < 3:
-            try:
-                out = run_command(["sudo", "-u", username, "yay", "-Qua", "--devel"])
-                if isinstance(out, list):
-                    update_set.update(out)
-                    break
-                else:
-                    raise Exception
-            except:
-                retries += 1
 
-    return len(update_set)  # Return total number of unique updates
+def vcs_origins(installed: dict, homes: list, schemes: tuple = None) -> tuple:
+    # ({package: [{(url, branch): sha}, ...]}, {(url, branch): uid}), one
+    # mapping per user whose yay vcs.json tracks the installed package, and
+    # who to ask the upstream as: the owner of the first vcs.json naming it
+    schemes = schemes or DEVEL_SCHEMES
+    origins = {}
+    owners = {}
+    for home in homes:
+        try:
+            fd = os.open(os.path.join(home, ".cache/yay/vcs.json"), os.O_NOFOLLOW)
+            with open(fd) as f:
+                uid = os.fstat(f.fileno()).st_uid
+                info = json.load(f)
+            found = {}
+            for pkg, sources in info.items():
+                if pkg not in installed:
+                    continue
+                heads = {}
+                for url, source in sources.items():
+                    if "://" not in url:
+                        url = (source.get("protocols") or ["https"])[0] + "://" + url
+                    branch = source.get("branch") or "HEAD"
+                    if url.split("://", 1)[
+                        0
+                    ] not in schemes or not DEVEL_REF_RE.fullmatch(branch):
+                        continue
+                    heads[(url, branch)] = source.get("sha")
+                if heads:
+                    found[pkg] = heads
+        except Exception:
+            continue
+        for pkg, heads in found.items():
+            origins.setdefault(pkg, []).append(heads)
+            for key in heads:
+                owners.setdefault(key, uid)
+    return origins, owners
+
+
+def ls_remote(url: str, branch: str, uid: int, schemes: tuple = None):
+    # As the user, without their git config (no url rewrites), and only
+    # over the DEVEL_SCHEMES transports
+    protocols = ["-c", "protocol.allow=never"]
+    for scheme in schemes or DEVEL_SCHEMES:
+        protocols += ["-c", f"protocol.{scheme}.allow=always"]
+    lines = run_command(
+        ["git", *protocols, "ls-remote", "--", url, branch],
+        budget=DEVEL_TIMEOUT,
+        timeout=DEVEL_TIMEOUT,
+        env={
+            **os.environ,
+            "HOME": pwd.getpwuid(uid).pw_dir,
+            "GIT_CONFIG_GLOBAL": "/dev/null",
+            "GIT_PROTOCOL_FROM_USER": "0",
+            "GIT_TERMINAL_PROMPT": "0",
+            "GIT_SSH_COMMAND": "ssh -o BatchMode=yes",
+        },
+        user=uid,
+    )
+    return lines[0].split("\t", 1)[0] if lines else None
+
+
+def remote_heads(keys: dict, schemes: tuple = None) -> dict:
+    # {(url, branch): sha or None}, each upstream asked at most once per TTL
+    now = time.monotonic()
+    with _remote_heads_lock:
+        heads = {
+            key: _remote_heads[key][0]
+            for key in keys
+            if key in _remote_heads and now - _remote_heads[key][1] < DEVEL_HEAD_TTL
+        }
+    missing = [key for key in keys if key not in heads]
+    if missing:
+        with ThreadPoolExecutor(max_workers=DEVEL_WORKERS) as pool:
+            resolved = list(
+                pool.map(lambda key: ls_remote(*key, keys[key], schemes), missing)
+            )
+        now = time.monotonic()
+        with _remote_heads_lock:
+            for key, sha in zip(missing, resolved):
+                if sha is not None:
+                    _remote_heads[key] = (sha, now)
+                heads[key] = sha
+    return heads
+
+
+def devel_pending(origins: dict, owners: dict, schemes: tuple = None) -> set:
+    heads = remote_heads(owners, schemes)
+    if heads and all(sha is None for sha in heads.values()):
+        return None  # No upstream reachable, nothing to go by
+
+    # A package is current if some user built it from the current heads;
+    # upstreams that could not be reached don't count against it.
+    return {
+        pkg
+        for pkg, records in origins.items()
+        if not any(
+            all(heads[key] in (None, sha) for key, sha in record.items())
+            for record in records
+        )
+    }
 
 
-def fetch_news() -> str | bool:
-    try:
-        response = requests.get(
-            "https://raw.githubusercontent.com/BredOS/news/refs/heads/main/notice.txt",
-            timeout=5,
+def foreign_packages(
+    installed: dict, dbpaths: tuple = (WATCH_DIR, SYNC_DBPATH)
+) -> dict:
+    # Installed packages none of the configured repos carry, the AUR ones,
+    # like `pacman -Qm`. The system dbs come first: the updates stage
+    # rewrites the private copy while this runs, and creates it on first boot.
+    repos = configured_repos()
+    for dbpath in dbpaths:
+        carried = set()
+        found = False
+        for repo in repos:
+            try:
+                carried.update(
+                    sync_packages(os.path.join(dbpath, "sync", repo + ".db"))
+                )
+            except FileNotFoundError:
+                continue
+            found = True
+        if found:
+            return {name: v for name, v in installed.items() if name not in carried}
+    raise FileNotFoundError(f"No sync databases in {', '.join(dbpaths)}")
+
+
+def aur_pending(foreign: dict) -> set:
+    pending = set()
+    names = sorted(foreign)
+    for i in range(0, len(names), AUR_BATCH):
+        response = _session.get(
+            AUR_RPC_URL, params={"arg[]": names[i : i + AUR_BATCH]}, timeout=10
         )
         response.raise_for_status()
-        return response.text
+        for result in response.json().get("results", []):
+            name = result.get("Name")
+            if name in foreign and vercmp(result["Version"], foreign[name]) > 0:
+                pending.add(name)
+    return pending
+
+
+def get_devel_updates():
+    # Like `yay -Qua --devel` did: AUR packages with a newer version, and
+    # VCS packages whose upstream moved past the commit they were built from
+    homes = yay_homes()
+    if not homes:
+        return 0
+    aur = aur_pending(foreign_packages(_package_index.packages()))
+    devel = devel_pending(*vcs_origins(_package_index.vcs_packages(), homes))
+    if devel is None:
+        return None
+    return len(aur | devel)
+
+
+def devel_check() -> None:
+    # Two file:// upstreams, one package built from the current head and
+    # one from an older commit, next to entries that must be refused.
+    def git(*args, cwd=None) -> str:
+        identity = ["-c", "user.name=check", "-c", "user.email=check@localhost"]
+        return subprocess.run(
+            ["git", *identity, *args],
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    with tempfile.TemporaryDirectory() as root:
+        shas = {}
+        for repo in ("current", "moved"):
+            path = os.path.join(root, repo)
+            git("init", "-q", path)
+            for message in ("first", "second"):
+                git("commit", "-q", "--allow-empty", "-m", message, cwd=path)
+            shas[repo] = (
+                git("rev-parse", "HEAD~1", cwd=path),
+                git("rev-parse", "HEAD", cwd=path),
+            )
+
+        marker = os.path.join(root, "injected")
+        home = os.path.join(root, "home")
+        os.makedirs(os.path.join(home, ".cache/yay"))
+        vcs = {
+            "current-git": {
+                f"file://{root}/current": {"branch": "HEAD", "sha": shas["current"][1]}
+            },
+            "moved-git": {
+                f"file://{root}/moved": {"branch": "HEAD", "sha": shas["moved"][0]}
+            },
+            "injected-git": {
+                f"--upload-pack=touch {marker};git-upload-pack #://x": {
+                    "branch": "HEAD"
+                },
+                f"file://{root}/current": {"branch": f"--upload-pack=touch {marker}"},
+                f"https://{root}/current": {"branch": "HEAD"},
+            },
+        }
+        with open(os.path.join(home, ".cache/yay/vcs.json"), "w") as f:
+            json.dump(vcs, f)
+
+        installed = dict.fromkeys(vcs, "1-1")
+        origins, owners = vcs_origins(installed, [home], schemes=("file",))
+        pending = devel_pending(origins, owners, schemes=("file",))
+        print(f"tracked: {sorted(origins)}, pending: {sorted(pending or ())}")
+        if sorted(origins) != ["current-git", "moved-git"] or pending != {"moved-git"}:
+            raise SystemExit("devel check: unexpected result")
+        if os.path.exists(marker):
+            raise SystemExit("devel check: vcs.json entry ran a command")
+        print("devel check: ok")
+
+
+def write_state(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.rename(tmp, path)
+
+
+def load_http_cache() -> dict:
+    global _http_cache
+    if _http_cache is None:
+        try:
+            with open(HTTP_CACHE_FILE) as f:
+                _http_cache = json.load(f)
+        except (OSError, ValueError):
+            _http_cache = {}
+    return _http_cache
+
+
+def fetch_cached(url: str, parse=None) -> tuple:
+    # Revalidate with the ETag / Last-Modified of the copy we already have,
+    # on 304 its parsed result is reused as is.
+    with _http_cache_lock:
+        entry = load_http_cache().get(url)
+
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = _session.get(url, headers=headers, timeout=5)
+    if response.status_code == 304 and entry is not None:
+        # Still current: only when we last heard so changes
+        entry = dict(entry, fetched=int(time.time()))
+    else:
+        response.raise_for_status()
+        entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "parsed": parse(response.text) if parse is not None else response.text,
+            "fetched": int(time.time()),
+        }
+    with _http_cache_lock:
+        _http_cache[url] = entry
+        try:
+            write_state(HTTP_CACHE_FILE, _http_cache)
+        except OSError:
+            pass
+    return entry["parsed"], None
+
+
+def last_known_good(url: str, default) -> tuple:
+    # Whatever we fetched last, along with when, for when a refresh fails
+    with _http_cache_lock:
+        entry = load_http_cache().get(url)
+    if entry is None:
+        return default, None
+    return entry["parsed"], entry.get("fetched", 0)
+
+
+def fetch_news() -> tuple:
+    # (news, stale since, refreshed)
+    try:
+        return fetch_cached(NEWS_URL) + (True,)
     except:
-        return False
+        return last_known_good(NEWS_URL, False) + (False,)
 
 
-def fetch_upd_recommends() -> str:
+def parse_upd_recommends(text: str) -> str:
     val = "Unknown"
     try:
-        response = requests.get(
-            "https://raw.githubusercontent.com/BredOS/news/refs/heads/main/upd_recommends.toml",
-            timeout=5,
-        )
-        response.raise_for_status()
-        data = tomllib.loads(response.text)
+        data = tomllib.loads(text)
 
         arch = platform.machine().lower()
 
@@ -257,7 +1116,54 @@ def fetch_upd_recommends() -> str:
         return val
 
 
-def write_cache(updates, devel_updates, news, upd_recommends, smart) -> None:
+def fetch_upd_recommends() -> tuple:
+    try:
+        return fetch_cached(UPD_RECOMMENDS_URL, parse_upd_recommends) + (True,)
+    except:
+        return last_known_good(UPD_RECOMMENDS_URL, "Unknown") + (False,)
+
+
+def write_snapshot(payload: dict) -> int:
+    data = json.dumps(payload).encode()
+    generation = 1
+
+    previous = None
+    try:
+        fd = os.open(SNAPSHOT_FILE, os.O_RDWR | os.O_NOFOLLOW)
+        previous = os.fdopen(fd, "r+b")
+        if os.fstat(fd).st_uid != os.getuid():
+            raise PermissionError(f"{SNAPSHOT_FILE} is not ours")
+        magic, _, last, _ = SNAPSHOT_HEADER.unpack(previous.read(SNAPSHOT_HEADER.size))
+        if magic == SNAPSHOT_MAGIC:
+            generation = last + 1
+    except (OSError, struct.error):
+        if previous is not None:
+            previous.close()
+            previous = None
+
+    tmp = SNAPSHOT_FILE + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    with os.fdopen(fd, "wb") as f:
+        f.write(
+            SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_VERSION, generation, len(data)
+            )
+        )
+        f.write(data)
+    os.rename(tmp, SNAPSHOT_FILE)
+
+    # Clients keep the replaced file mapped, bumping its generation tells
+    # them to remap the new one.
+    if previous is not None:
+        with previous:
+            previous.seek(SNAPSHOT_GENERATION_OFFSET)
+            previous.write(SNAPSHOT_GENERATION.pack(generation))
+    return generation
+
+
+def write_cache(
+    updates, devel_updates, news, upd_recommends, smart, stale=None
+) -> None:
     payload = {
         "updates": updates,
         "devel_updates": devel_updates,
@@ -265,6 +1171,7 @@ def write_cache(updates, devel_updates, news, upd_recommends, smart) -> None:
         "updrecommends": upd_recommends,
         "timestamp": int(time.time()),
         "smart": smart,
+        "stale": stale or {},
     }
     try:
         tmp = CACHE_FILE + ".tmp"
@@ -272,72 +1179,499 @@ def write_cache(updates, devel_updates, news, upd_recommends, smart) -> None:
         with os.fdopen(fd, "w") as f:
             json.dump(payload, f)
         os.rename(tmp, CACHE_FILE)
-        print(f'Cache updated. (Timestamp: {payload["timestamp"]})')
+        generation = write_snapshot(payload)
+        print(
+            f'Cache updated. (Timestamp: {payload["timestamp"]}, Generation: {generation})'
+        )
     except Exception:
         print("Failed")
+        return
+    publish(payload)
+
+
+def run_stages(stages: dict) -> dict:
+    results = {}
+    started = {}
+
+    def timed(name, func):
+        started[name] = time.monotonic()
+        return func()
+
+    pool = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage")
+    pending = {pool.submit(timed, name, func): name for name, func in stages.items()}
+    while pending:
+        done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            try:
+                results[name] = future.result()
+            except Exception as err:
+                print(f"Stage {name} failed: {err}")
+                results[name] = None
+
+        now = time.monotonic()
+        for future, name in list(pending.items()):
+            if name in started and now - started[name] > STAGE_TIMEOUTS[name]:
+                print(f"Stage {name} timed out")
+                future.cancel()
+                del pending[future]
+                results[name] = None
+
+    # Stages that blew their deadline are left to finish in the background
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results
 
 
-def wait_for_unlock() -> None:
-    print("Detected pacman db lock, waiting")
-    while os.path.exists(PACMAN_LOCK):
-        time.sleep(1)
+def jittered(seconds: float) -> float:
+    return seconds * random.uniform(1 - SCHEDULE_JITTER, 1 + SCHEDULE_JITTER)
 
 
-def check_and_update() -> bool:
-    global MUTEX_LOCK
-    if MUTEX_LOCK:
-        return False
-    MUTEX_LOCK = True
+def init_schedule() -> None:
+    now = time.monotonic()
+    with _schedule_lock:
+        for source in SCHEDULE:
+            spread = source in SCHEDULE_SPREAD
+            _schedule[source] = [
+                now + random.uniform(0, STARTUP_SPREAD) * spread,
+                0,
+                None,
+            ]
+
+
+def reschedule(source: str, ok: bool) -> None:
+    with _schedule_lock:
+        entry = _schedule[source]
+        entry[1] = 0 if ok else entry[1] + 1
+        delay = SCHEDULE[source]
+        if entry[1]:
+            delay = min(SCHEDULE_RETRY * 2 ** (entry[1] - 1), delay)
+        entry[2] = time.monotonic()
+        entry[0] = entry[2] + jittered(delay)
+
+
+def force(*sources, min_age: float = 0) -> None:
+    # Due right away, all of them if none are named, unless they ran
+    # less than min_age seconds ago
+    now = time.monotonic()
+    with _schedule_lock:
+        for source in sources or SCHEDULE:
+            last = _schedule[source][2]
+            if last is None or now - last >= min_age:
+                _schedule[source][0] = 0
+
+
+def due_sources() -> list:
+    now = time.monotonic()
+    with _schedule_lock:
+        return [source for source, (due, *_) in _schedule.items() if due <= now]
+
+
+def next_due() -> float:
+    with _schedule_lock:
+        return min(due for due, *_ in _schedule.values())
+
+
+def run_update_check() -> bool:
+    sources = due_sources()
+    if not sources:
+        return True
     if not has_internet():
-        MUTEX_LOCK = False
         return False
-    print("Update check triggered")
-    updates = get_updates()
-    devel = get_devel_updates()
-    news = fetch_news()
-    upd_recommends = fetch_upd_recommends()
-    smart = smart_health_report()
+    print(f"Update check triggered ({', '.join(sources)})")
+    stages = {
+        "updates": get_updates,
+        "devel": get_devel_updates,
+        "news": fetch_news,
+        "upd_recommends": fetch_upd_recommends,
+        "smart": smart_health_report,
+    }
+    results = run_stages({source: stages[source] for source in sources})
+
+    ok = True
+    for source in sources:
+        # The fetches fall back to the last good copy or their default,
+        # which is not a refresh
+        good = results[source] is not None
+        if source in ("news", "upd_recommends"):
+            good = good and results[source][2]
+        reschedule(source, good)
+        ok = ok and good
+
+    # Sources that weren't due, or failed, keep their last good result,
+    # which after a restart is what was published last
+    previous = _published.get("payload") or {}
+    previous_stale = previous.get("stale") or {}
+    for source, key in (
+        ("updates", "updates"),
+        ("devel", "devel_updates"),
+        ("smart", "smart"),
+    ):
+        if results.get(source) is not None:
+            _latest[source] = results[source]
+        elif source not in _latest and previous.get(key) is not None:
+            _latest[source] = previous[key]
+    updates = _latest.get("updates")
+    devel = _latest.get("devel")
     if updates is None or devel is None:
-        MUTEX_LOCK = False
         return False
-    write_cache(updates, devel, news, upd_recommends, smart)
-    MUTEX_LOCK = False
-    return True
 
+    # When a refresh failed the last good copy is published, and the client
+    # is told since when it is stale.
+    stale = {}
+    fetched = {}
+    for source, key, url, default in (
+        ("news", "news", NEWS_URL, False),
+        ("upd_recommends", "updrecommends", UPD_RECOMMENDS_URL, "Unknown"),
+    ):
+        if source in sources:
+            value, since = (results[source] or last_known_good(url, default))[:2]
+        elif key in previous:
+            value, since = previous[key], previous_stale.get(key)
+        else:
+            value, since = last_known_good(url, default)[0], None
+        fetched[key] = value
+        if since is not None:
+            stale[key] = since
+    write_cache(
+        updates,
+        devel,
+        fetched["news"],
+        fetched["updrecommends"],
+        _latest.get("smart"),
+        stale,
+    )
+    return ok
+
+
+class SingleFlight:
+    # Runs `func` for one caller at a time. Whoever asks while a run is in
+    # flight joins the single follow-up run it schedules, as that run is
+    # the first one that can see what changed in the meantime.
+
+    def __init__(self, func) -> None:
+        self.func = func
+        self.cond = threading.Condition()
+        self.running = False
+        self.rerun = False
+        self.started = 0
+        self.finished = 0
+        self.result = None
+
+    def __call__(self, wait: bool = True):
+        with self.cond:
+            if self.running:
+                self.rerun = True
+                if not wait:
+                    return None
+                ticket = self.started + 1
+                while self.finished < ticket:
+                    self.cond.wait()
+                return self.result
+            self.running = True
+
+        while True:
+            with self.cond:
+                self.rerun = False
+                self.started += 1
+            try:
+                result = self.func()
+            except Exception as err:
+                print(f"Update check failed: {err}")
+                result = False
+            with self.cond:
+                self.finished = self.started
+                self.result = result
+                self.cond.notify_all()
+                if not self.rerun:
+                    self.running = False
+                    return result
+
+
+check_and_update = SingleFlight(run_update_check)
+
+
+class Connectivity:
+    # Knows whether there is a default route, re-evaluated with `probe` on
+    # every item from `events` (rtnetlink by default, anything iterable will
+    # do). Without an event source it falls back to polling every RETRY_DELAY.
+
+    def __init__(self, events=None, probe=has_default_route) -> None:
+        self.events = events
+        self.probe = probe
+        self.cond = threading.Condition()
+        self.online = probe()
+        self.alive = False
+
+    def start(self) -> None:
+        if self.events is None:
+            try:
+                self.events = netlink_events()
+            except OSError as err:
+                print(f"No rtnetlink ({err}), polling for connectivity")
+                return
+        self.alive = True
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def run(self) -> None:
+        try:
+            for _ in self.events:
+                self.update(self.probe())
+        finally:
+            with self.cond:
+                self.alive = False
+                self.cond.notify_all()
+
+    def update(self, online: bool) -> None:
+        with self.cond:
+            if online and not self.online:
+                print("Default route is up")
+            self.online = online
+            self.cond.notify_all()
+
+    def wait_online(self) -> None:
+        with self.cond:
+            while not self.online:
+                if self.alive:
+                    self.cond.wait()
+                else:
+                    self.cond.wait(RETRY_DELAY)
+                    self.online = self.probe()
 
-def run_periodic() -> None:
+
+def run_periodic(monitor: Connectivity) -> None:
     while True:
+        # Sleeps through outages, and checks as soon as a route shows up
+        monitor.wait_online()
         ok = check_and_update()
-        time.sleep(RETRY_DELAY if not ok and not has_internet() else NORMAL_DELAY)
+        if not ok and not monitor.online:
+            continue
+        if not ok and not has_internet():
+            time.sleep(RETRY_DELAY)
+            continue
+        # Failed sources have been rescheduled with their backoff
+        time.sleep(max(next_due() - time.monotonic(), 1))
+
+
+class Trigger:
+    # Coalesces a burst of pacman db events into one pending check, which
+    # fires once db.lck is gone and things have gone quiet, or right away
+    # when the lock release itself was seen.
+
+    def __init__(self, action) -> None:
+        self.action = action
+        self.cond = threading.Condition()
+        self.pending = False
+        self.released = False
+        self.last_event = 0
+
+    def poke(self, released: bool = False) -> None:
+        with self.cond:
+            self.pending = True
+            self.released = self.released or released
+            self.last_event = time.monotonic()
+            self.cond.notify()
+
+    def wait(self) -> None:
+        with self.cond:
+            while not self.pending:
+                self.cond.wait()
+
+            waiting = False
+            while True:
+                if os.path.exists(PACMAN_LOCK):
+                    if not waiting:
+                        print("Detected pacman db lock, waiting")
+                        waiting = True
+                    self.released = False
+                    self.cond.wait(LOCK_RECHECK)
+                    continue
+                if self.released:
+                    break
+                remaining = self.last_event + QUIET_PERIOD - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.cond.wait(remaining)
+
+            self.pending = False
+            self.released = False
+
+    def run(self) -> None:
+        while True:
+            self.wait()
+            self.action()
 
 
 class Handler(pyinotify.ProcessEvent):
+    def my_init(self, trigger=None, index=None):
+        self.trigger = trigger
+        self.index = index
+
+    def in_local(self, event) -> bool:
+        # Package directories appearing or going away under local/
+        if os.path.normpath(event.path) != self.index.local:
+            return False
+        self.index.touch(event.name)
+        return True
+
+    def process_IN_CREATE(self, event):
+        self.in_local(event)
+
+    def process_IN_MOVED_FROM(self, event):
+        self.in_local(event)
+
     def process_IN_CLOSE_WRITE(self, event):
-        wait_for_unlock()
-        check_and_update()
+        self.trigger.poke()
 
     def process_IN_MOVED_TO(self, event):
-        wait_for_unlock()
-        check_and_update()
+        if not self.in_local(event):
+            self.trigger.poke()
+
+    def process_IN_DELETE(self, event):
+        if not self.in_local(event):
+            self.trigger.poke(released=event.name == os.path.basename(PACMAN_LOCK))
+
+    def process_IN_Q_OVERFLOW(self, event):
+        self.index.invalidate()
+        self.trigger.poke()
 
 
-def run_watcher() -> pyinotify.ThreadedNotifier:
+def run_watcher(trigger: Trigger) -> pyinotify.ThreadedNotifier:
     wm = pyinotify.WatchManager()
-    notifier = pyinotify.ThreadedNotifier(wm, Handler())
-    wm.add_watch(WATCH_DIR, pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO)
+    notifier = pyinotify.ThreadedNotifier(
+        wm, Handler(trigger=trigger, index=_package_index)
+    )
+    wm.add_watch(
+        WATCH_DIR,
+        pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO | pyinotify.IN_DELETE,
+    )
+    wm.add_watch(
+        _package_index.local,
+        pyinotify.IN_CREATE
+        | pyinotify.IN_DELETE
+        | pyinotify.IN_MOVED_FROM
+        | pyinotify.IN_MOVED_TO,
+    )
     notifier.start()
     return notifier
 
 
+# Local API, newline delimited JSON over SOCKET_PATH:
+#   {"cmd": "get"}        -> {"snapshot": {...}}
+#   {"cmd": "check"}      -> {"ok": bool, "snapshot": {...}} once a check ran,
+#                            of CHECK_SOURCES, rate limited by CHECK_MIN_AGE
+#   {"cmd": "subscribe"}  -> {"snapshot": {...}} now and after every update
+#   {"cmd": "stats"}      -> {"commands": {name: {"ok": n, "timeout": n, ...}}}
+class ApiHandler(socketserver.StreamRequestHandler):
+    def setup(self) -> None:
+        super().setup()
+        self.write_lock = threading.Lock()
+        # A subscriber that stops reading must not stall publishing
+        self.connection.setsockopt(
+            socket.SOL_SOCKET, socket.SO_SNDTIMEO, struct.pack("ll", 5, 0)
+        )
+
+    def send(self, message: dict) -> None:
+        with self.write_lock:
+            self.wfile.write(json.dumps(message).encode() + b"\n")
+
+    def handle(self) -> None:
+        try:
+            while True:
+                line = self.rfile.readline(4096)
+                if not line:
+                    break
+                self.dispatch(line)
+        except OSError:
+            pass
+        finally:
+            with _subscribers_lock:
+                _subscribers.discard(self)
+
+    def dispatch(self, line: bytes) -> None:
+        try:
+            cmd = json.loads(line).get("cmd")
+        except (ValueError, AttributeError):
+            cmd = None
+
+        if cmd == "get":
+            self.send({"snapshot": _published.get("payload")})
+        elif cmd == "check":
+            # Concurrent callers are coalesced into one check. Anyone can
+            # ask, so it doesn't reach past what a transaction would.
+            force(*CHECK_SOURCES, min_age=CHECK_MIN_AGE)
+            ok = check_and_update()
+            self.send({"ok": bool(ok), "snapshot": _published.get("payload")})
+        elif cmd == "subscribe":
+            with _subscribers_lock:
+                _subscribers.add(self)
+            self.send({"snapshot": _published.get("payload")})
+        elif cmd == "stats":
+            self.send({"commands": command_stats()})
+        else:
+            self.send({"error": "unknown command"})
+
+
+class ApiServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def publish(payload: dict) -> None:
+    _published["payload"] = payload
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for subscriber in subscribers:
+        try:
+            subscriber.send({"snapshot": payload})
+        except OSError:
+            with _subscribers_lock:
+                _subscribers.discard(subscriber)
+
+
+def run_api() -> ApiServer:
+    try:
+        with open(CACHE_FILE) as f:
+            _published["payload"] = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        os.unlink(SOCKET_PATH)
+    except FileNotFoundError:
+        pass
+    server = ApiServer(SOCKET_PATH, ApiHandler)
+    os.chmod(SOCKET_PATH, 0o666)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
 def main() -> None:
-    notifier = run_watcher()
+    init_schedule()
+
+    def transaction():
+        # Changes what is installed, not the news
+        force("updates", "devel")
+        check_and_update(wait=False)
+
+    trigger = Trigger(transaction)
+    threading.Thread(target=trigger.run, daemon=True).start()
+    notifier = run_watcher(trigger)
+    api = run_api()
+    monitor = Connectivity()
+    monitor.start()
     try:
-        run_periodic()
+        run_periodic(monitor)
     finally:
+        api.shutdown()
         notifier.stop()
 
 
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+        sys.exit(0)
+    if "--devel-check" in sys.argv[1:]:
+        devel_check()
+        sys.exit(0)
     print("Starting..")
     try:
         main()